@@ -9,6 +9,8 @@ def page_layout():
     st.sidebar.page_link("app.py", label="Home", icon=":material/home:", use_container_width=True)
     st.sidebar.write("Dashboard")
     st.sidebar.page_link("pages/dashboard.py", label="Dashboard", icon=":material/dashboard:", use_container_width=True)
+    st.sidebar.write("Operations")
+    st.sidebar.page_link("pages/ops.py", label="Operations", icon=":material/monitoring:", use_container_width=True)
     st.title("Bitchute Analytics Dashboard")
     st.header("Introduction")
     st.write("As online platforms grow in influence, understanding how misinformation spreads and how users engage with such content is crucial. This system analyzes user engagement patterns on BitChute, focusing on how information integrity influences user interaction (views, likes, dislikes, and comments) and using various graphs and metrics, it shows the  trends in misinformation dynamics.")
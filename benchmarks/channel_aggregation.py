@@ -0,0 +1,115 @@
+"""
+Benchmarks channel trend aggregation against the number of videos per channel.
+
+Compares the vectorized trend_aggregation.aggregate_channel_samples with the
+previous per-video implementation (one DataFrame per video and metric, then a
+Python dict loop), on synthetic channels with hourly samples for every video.
+
+Usage:
+    python3 benchmarks/channel_aggregation.py [--videos 10 100 500] [--samples 720] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sql_operations import TREND_METRICS
+from trend_aggregation import aggregate_channel_samples
+
+def legacy_process_channel_data(channel_data):
+    """
+    The aggregation pages/channel.py used before vectorization, kept as the baseline.
+
+    Parameters:
+        channel_data (list): One dictionary of trend lists per video.
+
+    Returns:
+        dict: A dictionary with aggregated trend data for each metric.
+    """
+    result = {}
+    for key in TREND_METRICS.values():
+        flattened = []
+        for item in channel_data:
+            df = pd.DataFrame(item[key])
+            df = df.drop_duplicates(subset='t', keep='last')
+            flattened.extend(df.to_dict(orient='records'))
+        aggregated_data = defaultdict(int)
+        for entry in flattened:
+            aggregated_data[entry['t']] += entry['c']
+        result[key] = [{'t': timestamp, 'c': value} for timestamp, value in aggregated_data.items()]
+    return result
+
+def make_channel(videos, samples):
+    """
+    Builds a synthetic channel whose videos were uploaded at staggered hours and sampled every
+    hour since, so summing the samples of each hour, as the baseline does, gives the channel's totals.
+
+    Parameters:
+        videos (int): The number of videos in the channel.
+        samples (int): The number of hours sampled; videos uploaded later have fewer samples.
+
+    Returns:
+        tuple: (rows, channel_data) holding the same samples as (video_id, metric, t, c)
+        tuples and in the legacy per-video format.
+    """
+    start = datetime(2024, 1, 1)
+    hours = [(start + timedelta(hours=h)).strftime('%Y-%m-%d %H:00:00') for h in range(samples)]
+    rows = []
+    channel_data = []
+    for video_id in range(videos):
+        item = {}
+        for metric, column in TREND_METRICS.items():
+            points = [{'t': hours[h], 'c': (h - video_id % 24) * (video_id % 7 + 1)} for h in range(video_id % 24, samples)]
+            item[column] = points
+            rows.extend((video_id, metric, point['t'], point['c']) for point in points)
+        channel_data.append(item)
+    return rows, channel_data
+
+def best_of(repeat, function, argument):
+    """
+    Times a function and keeps the fastest of several runs.
+
+    Parameters:
+        repeat (int): The number of runs.
+        function (callable): The function to time.
+        argument: The argument to call it with.
+
+    Returns:
+        tuple: (seconds, result) for the fastest run.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(argument)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--videos', type=int, nargs='+', default=[10, 50, 100, 250, 500])
+    parser.add_argument('--samples', type=int, default=720, help='hours sampled (default: 30 days)')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'videos':>8} {'samples':>10} {'legacy s':>10} {'vectorized s':>13} {'speedup':>8}")
+    for videos in args.videos:
+        rows, channel_data = make_channel(videos, args.samples)
+        legacy_time, legacy = best_of(args.repeat, legacy_process_channel_data, channel_data)
+        vectorized_time, vectorized = best_of(args.repeat, aggregate_channel_samples, rows)
+
+        for column in TREND_METRICS.values():
+            expected = sorted((point['t'], point['c']) for point in legacy[column])
+            actual = [(point['t'], point['c']) for point in vectorized[column]]
+            assert expected == actual, f"results differ for {column}"
+
+        print(f"{videos:>8} {len(rows):>10} {legacy_time:>10.3f} {vectorized_time:>13.3f} {legacy_time / vectorized_time:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,96 @@
+"""
+Checks the channel trend series of a catalog database against the video samples they are built from.
+
+A metric that only grows, like views, must never go down in a channel's series unless one of the
+channel's own videos went down; a series that sums only the videos sampled in each hour fails this.
+
+With --rebuild, the series the triggers kept is also compared with one rebuilt from the video samples by
+rebuild_channel_rollup. This writes to the database, so run it on a copy.
+
+Exits with status 1 if a check fails.
+
+Usage:
+    python3 benchmarks/channel_rollup_check.py catalog_10k.db [--metric views] [--rebuild]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db
+from sql_operations import TREND_METRICS, rebuild_channel_rollup
+
+def decreases(metric):
+    """
+    Counts the points of each channel's series that are lower than the point before.
+
+    Channels with a video whose own series goes down are skipped, since their series may go down too.
+
+    Parameters:
+        metric (str): The metric to check (see TREND_METRICS).
+
+    Returns:
+        tuple: (channels checked, points checked, {channel_url: decreasing points}).
+    """
+    conn = db.get_read_connection()
+    skipped = {row[0] for row in conn.execute('''
+        SELECT DISTINCT v.video_channel_url
+        FROM (SELECT video_id, c < LAG(c) OVER (PARTITION BY video_id ORDER BY t) AS down
+              FROM trend_samples WHERE metric = ?) s
+        JOIN videos v ON v.video_id = s.video_id
+        WHERE s.down''', (metric,))}
+    channels, points, failures = 0, 0, {}
+    for channel_url, down, count in conn.execute('''
+            SELECT channel_url, COALESCE(SUM(down), 0), COUNT(*)
+            FROM (SELECT channel_url, c < LAG(c) OVER (PARTITION BY channel_url ORDER BY t) AS down
+                  FROM channel_trend_samples WHERE metric = ?)
+            GROUP BY channel_url''', (metric,)):
+        if channel_url in skipped:
+            continue
+        channels += 1
+        points += count
+        if down:
+            failures[channel_url] = down
+    return channels, points, failures
+
+def rebuild_differences():
+    """
+    Rebuilds the channel series and counts the points that differ from the ones it replaced.
+
+    Returns:
+        tuple: (points before, points after, points in only one of the two).
+    """
+    conn = db.get_connection()
+    query = 'SELECT channel_url, metric, t, c, c_min, c_max FROM channel_trend_samples'
+    before = set(conn.execute(query))
+    rebuild_channel_rollup()
+    after = set(conn.execute(query))
+    return len(before), len(after), len(before ^ after)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('path')
+    parser.add_argument('--metric', default='views', choices=list(TREND_METRICS), help='a metric that only grows (default: views)')
+    parser.add_argument('--rebuild', action='store_true', help='also compare with a rebuilt series (writes to the database)')
+    args = parser.parse_args()
+
+    db.DB_PATH = args.path
+    channels, points, failures = decreases(args.metric)
+    print(f"{args.metric}: {channels} channels, {points} points checked")
+    for channel_url, down in sorted(failures.items(), key=lambda item: -item[1])[:10]:
+        print(f"  {channel_url} goes down at {down} points")
+    failed = bool(failures)
+    if failures:
+        print(f"FAILED: {len(failures)} channel series go down")
+    if args.rebuild:
+        before, after, differing = rebuild_differences()
+        print(f"rebuild: {before} points kept by the triggers, {after} rebuilt")
+        if differing:
+            print(f"FAILED: {differing} points differ")
+            failed = True
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,171 @@
+"""
+Times the dashboard's queries and chart preparation headlessly against one or more catalogs.
+
+Runs the same data functions the Streamlit pages call, without a Streamlit server:
+
+    dashboard    fetch_search_frame, the chart aggregations, fetch_video_page and fetch_channel_page
+    channel      fetch_channel_trends (the rollup) and the on-the-fly aggregation it falls back to
+                 (the former process_channel_data), for the largest channel
+    video        video_trend's fetch_trend + trend_frame for the video with the longest history
+
+Every operation runs cold: the query cache is cleared and the snapshot unmapped before each
+repeat. Latency is the best and median of --repeat runs; memory is the peak traced allocation
+of one further run.
+
+With --snapshot, each catalog is also exported to an Arrow snapshot next to it (reporting the
+export time) and every operation is timed a second time reading from the snapshot.
+
+Usage:
+    python3 benchmarks/synthetic_catalog.py catalog_10k.db --videos 10000
+    python3 benchmarks/dashboard_queries.py catalog_10k.db catalog_100k.db [--repeat 5] [--query news] [--snapshot]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dashboard_data
+import db
+import query_cache
+import snapshot
+from dashboard_data import (channel_summary, integrity_histogram, views_likes_by_integrity, fetch_search_frame,
+                            fetch_video_page, fetch_channel_page, fetch_channel_trends, fetch_video_trend, trend_frame)
+from sql_operations import TREND_METRICS, fetch_channel_samples, from_hour, to_hour
+from trend_aggregation import aggregate_channel_samples
+
+def charts(videos):
+    """
+    Computes everything the dashboard's charts draw from a search frame.
+    """
+    channels = channel_summary(videos)
+    return integrity_histogram(videos, "Videos_Count"), integrity_histogram(channels, "Channels_Count"), views_likes_by_integrity(videos)
+
+def deep_cursor(fetch_page, pages, *args):
+    """
+    Follows a paginated table `pages` pages in and returns the cursor of the next one.
+    """
+    cursor = None
+    for _ in range(pages):
+        _, next_cursor = fetch_page(*args, cursor)
+        if next_cursor is None:
+            break
+        cursor = next_cursor
+    return cursor
+
+def channel_charts(channel_url, start_date, end_date):
+    """
+    The channel page's data: the rolled-up series, downsampled per chart.
+    """
+    trends = fetch_channel_trends(channel_url, start_date, end_date)
+    return [trend_frame(trends[metric], start_date, end_date) for metric in TREND_METRICS]
+
+def channel_aggregation(channel_url, start_date, end_date):
+    """
+    The channel page's data computed from the videos' own samples, as process_channel_data did.
+    """
+    start = to_hour(datetime.combine(start_date, datetime.min.time()))
+    aggregated = aggregate_channel_samples(fetch_channel_samples(channel_url, start_date, end_date), start)
+    return [trend_frame(aggregated[column], start_date, end_date) for column in TREND_METRICS.values()]
+
+def video_charts(video_url, start_date, end_date):
+    """
+    The video page's data: every metric's series, downsampled per chart.
+    """
+    return [trend_frame(fetch_video_trend(video_url, metric, start_date, end_date), start_date, end_date)
+            for metric in TREND_METRICS]
+
+def measure(function, args, repeat):
+    """
+    Runs an operation cold `repeat` times for latency, then once more under tracemalloc.
+
+    Returns:
+        tuple: Best and median seconds, and peak traced MB.
+    """
+    timings = []
+    for _ in range(repeat):
+        query_cache._cache.clear()
+        snapshot._snapshot = None
+        start = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - start)
+
+    query_cache._cache.clear()
+    snapshot._snapshot = None
+    tracemalloc.start()
+    function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), statistics.median(timings), peak / 2 ** 20
+
+def operations(query):
+    """
+    Lists the operations to time against the current database, resolving their arguments from it.
+
+    Returns:
+        list: (name, function, args) tuples.
+    """
+    conn = db.get_read_connection()
+    videos, = conn.execute('SELECT COUNT(*) FROM videos').fetchone()
+    top_channel, = conn.execute('SELECT channel_url FROM channels ORDER BY video_count DESC LIMIT 1').fetchone()
+    busiest_video, = conn.execute('''SELECT video_url FROM videos WHERE video_id =
+                                     (SELECT video_id FROM trend_samples GROUP BY video_id ORDER BY COUNT(*) DESC LIMIT 1)''').fetchone()
+    last_sample, = conn.execute('SELECT MAX(t) FROM channel_trend_samples WHERE channel_url = ?', (top_channel,)).fetchone()
+    end_date = from_hour(last_sample).date()
+    week, quarter = end_date - timedelta(days=7), end_date - timedelta(days=90)
+    frame = fetch_search_frame('')
+
+    return videos, [
+        ("search frame", fetch_search_frame, ('',)),
+        (f"search frame '{query}'", fetch_search_frame, (query,)),
+        ("charts from frame", charts, (frame,)),
+        ("video page 1 by views", fetch_video_page, ('', "Views")),
+        ("video page 50 by upload date", fetch_video_page, ('', "Upload date", True, deep_cursor(fetch_video_page, 49, '', "Upload date", True))),
+        (f"video page 1 '{query}' by score", fetch_video_page, (query, "Integrity score")),
+        ("channel page 1 by views", fetch_channel_page, ('', "Views")),
+        (f"channel page 1 '{query}'", fetch_channel_page, (query, "Views")),
+        ("channel trends 7d (rollup)", channel_charts, (top_channel, week, end_date)),
+        ("channel trends 90d (rollup)", channel_charts, (top_channel, quarter, end_date)),
+        ("channel trends 7d (aggregated)", channel_aggregation, (top_channel, week, end_date)),
+        ("channel trends 90d (aggregated)", channel_aggregation, (top_channel, quarter, end_date)),
+        ("video_trend 7d", video_charts, (busiest_video, week, end_date)),
+        ("video_trend 90d", video_charts, (busiest_video, quarter, end_date)),
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('databases', nargs='+')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--query', default='news', help='search text for the filtered operations')
+    parser.add_argument('--snapshot', action='store_true', help='also time the operations against an Arrow snapshot')
+    args = parser.parse_args()
+
+    for path in args.databases:
+        db.close_connections()
+        db.DB_PATH = path
+        query_cache._cache.clear()
+        dashboard_data.SNAPSHOT_ENABLED = False
+        videos, ops = operations(args.query)
+        print(f"\n{path}: {videos} videos")
+
+        sources = ["sqlite"]
+        if args.snapshot:
+            snapshot.SNAPSHOT_DIR = f"{path}.snapshot"
+            start = time.perf_counter()
+            snapshot.export_snapshot()
+            print(f"snapshot exported to {snapshot.SNAPSHOT_DIR} in {time.perf_counter() - start:.1f}s")
+            sources.append("snapshot")
+
+        for source in sources:
+            dashboard_data.SNAPSHOT_ENABLED = source == "snapshot"
+            print(f"{f'operation ({source})':<36} {'best ms':>10} {'median ms':>10} {'peak MB':>9}")
+            for name, function, function_args in ops:
+                best, median, peak = measure(function, function_args, args.repeat)
+                print(f"{name:<36} {best * 1000:>10.1f} {median * 1000:>10.1f} {peak:>9.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+Benchmarks the scraping and ingest path offline, stage by stage, from captured page fixtures.
+
+No browser or network is used. Browser scraping runs against FakeDriver, which replays the
+elements captured in fixtures/*.json and can add a fixed delay per WebDriver call to stand in
+for the chromedriver round trip. HTTP scraping fetches fixtures/video_page.html from a local
+server. Writes go to a scratch database.
+
+Stages:
+    search_videos       scraper.search_videos on the search page capture
+    get_video_data      scraper.get_video_data on the video page capture, per EXTRACTION_MODE
+    http_fetch          http_scraper.fetch_video_data_http against the local server
+    process_video_data  one synchronous write per video
+    write_video_batch   one batched transaction of --batch-size videos
+
+Reports p50/p95 latency and pages per minute for each stage, WebDriver calls per page, and
+the process's peak RSS after each stage.
+
+Usage:
+    python3 benchmarks/scraper_pipeline.py [--pages 500] [--searches 50] [--call-latency-ms 2] [--batch-size 50]
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from bs4 import BeautifulSoup
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.remote.webelement import WebElement
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db
+import http_scraper
+import scraper
+from process_data import process_video_data, video_record
+from sql_operations import create_db, to_hour, write_video_batch
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+class FakeElement(WebElement):
+    """
+    A captured DOM node: its rendered text, attributes and the children found by relative XPaths.
+
+    Subclasses WebElement so ActionChains accepts it.
+    """
+
+    def __init__(self, driver, node):
+        super().__init__(driver, str(id(node)))
+        self._driver = driver
+        self._node = node
+
+    @property
+    def text(self):
+        self._driver.call()
+        return self._node["text"]
+
+    def get_attribute(self, name):
+        self._driver.call()
+        return self._node["attributes"].get(name)
+
+    def click(self):
+        self._driver.call()
+
+    def find_element(self, by, xpath):
+        elements = self.find_elements(by, xpath)
+        if not elements:
+            raise NoSuchElementException(xpath)
+        return elements[0]
+
+    def find_elements(self, by, xpath):
+        self._driver.call()
+        return [FakeElement(self._driver, child) for child in self._node["children"].get(xpath, [])]
+
+class FakeDriver:
+    """
+    Stands in for webdriver.Chrome, replaying a page capture for every URL it is sent to.
+
+    Search URLs get the search page capture and every other URL the video page capture. Each
+    WebDriver call is counted and delayed by `call_latency` seconds.
+    """
+
+    def __init__(self, video_page, search_page, call_latency=0.0):
+        self.video_page = video_page
+        self.search_page = search_page
+        self.call_latency = call_latency
+        self.page = None
+        self.current_url = None
+        self.calls = 0
+
+    def call(self):
+        self.calls += 1
+        if self.call_latency:
+            time.sleep(self.call_latency)
+
+    def get(self, url):
+        self.call()
+        self.current_url = url
+        self.page = self.search_page if "/search" in url else self.video_page
+
+    def find_elements(self, by, xpath):
+        self.call()
+        return [FakeElement(self, node) for node in self.page["elements"].get(xpath, [])]
+
+    def find_element(self, by, xpath):
+        nodes = self.page["elements"].get(xpath)
+        if not nodes:
+            self.call()
+            raise NoSuchElementException(xpath)
+        return self.find_elements(by, xpath)[0]
+
+    def execute(self, command, params=None):
+        # Pointer actions (ActionChains) are accepted and ignored
+        self.call()
+        return {"value": None}
+
+    def execute_script(self, script, *args):
+        self.call()
+        if script == scraper.PAGE_BYTES_SCRIPT:
+            return self.page.get("bytes", 0)
+        if script == scraper.EXTRACT_VIDEO_SCRIPT:
+            return self._extract(*args)
+        raise NotImplementedError("FakeDriver does not run arbitrary scripts")
+
+    def _extract(self, fields, hashtags, waits):
+        """
+        Answers EXTRACT_VIDEO_SCRIPT from the capture, as the browser would in one call.
+        """
+        elements = self.page["elements"]
+        waiting = [xpath for xpath, require_text in waits
+                   if not elements.get(xpath) or (require_text and not elements[xpath][0]["text"].strip())]
+        if waiting:
+            return {"waiting": waiting}
+        result = {}
+        for name, (xpath, prop) in fields.items():
+            nodes = elements.get(xpath)
+            result[name] = None if not nodes else nodes[0]["text"] if prop == "text" else nodes[0]["attributes"].get(prop)
+        containers = elements.get(hashtags[0])
+        result["hashtags"] = None if not containers else [
+            (anchor["children"].get(hashtags[2]) or [{"text": ""}])[0]["text"]
+            for anchor in containers[0]["children"].get(hashtags[1], [])]
+        result["upload_date"] = self.page.get("upload_date")
+        return result
+
+def load_capture(name):
+    """
+    Loads a page capture, attaching the served HTML's size and JSON-LD upload date if it has one.
+
+    Parameters:
+        name (str): The capture's file name in the fixtures directory.
+
+    Returns:
+        dict: The capture.
+    """
+    with open(os.path.join(FIXTURES, name)) as f:
+        capture = json.load(f)
+    if capture.get("html"):
+        with open(os.path.join(FIXTURES, capture["html"]), "rb") as f:
+            html = f.read()
+        capture["bytes"] = len(html)
+        video_object = http_scraper._find_video_object(BeautifulSoup(html, "html.parser")) or {}
+        capture["upload_date"] = video_object.get("uploadDate")
+    return capture
+
+def start_fixture_server(html_name):
+    """
+    Serves one fixture page for every path on a local port.
+
+    Parameters:
+        html_name (str): The HTML fixture to serve.
+
+    Returns:
+        tuple: The server and its base URL.
+    """
+    class Handler(SimpleHTTPRequestHandler):
+        def translate_path(self, path):
+            return os.path.join(FIXTURES, html_name)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(Handler, directory=FIXTURES))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def percentile(values, fraction):
+    """
+    Returns the value below which `fraction` of the sorted values fall (nearest rank).
+    """
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def peak_rss_mb():
+    """
+    Returns the peak resident memory of this process so far, in MB (Linux reports KB).
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def timed(function, arguments):
+    """
+    Calls a function once per argument tuple.
+
+    Returns:
+        tuple: The per-call latencies in seconds and the results.
+    """
+    latencies = []
+    results = []
+    for args in arguments:
+        start = time.perf_counter()
+        results.append(function(*args))
+        latencies.append(time.perf_counter() - start)
+    return latencies, results
+
+def report(stage, latencies, pages=None, calls=None):
+    """
+    Prints one row of the results table; `pages` defaults to one page per call.
+    """
+    pages = pages or len(latencies)
+    pages_per_minute = 60 * pages / sum(latencies)
+    driver_calls = f"{calls / pages:>9.1f}" if calls is not None else f"{'-':>9}"
+    print(f"{stage:<28} {len(latencies):>6} {percentile(latencies, 0.5) * 1000:>9.2f} {percentile(latencies, 0.95) * 1000:>9.2f} "
+          f"{pages_per_minute:>12.0f} {driver_calls} {peak_rss_mb():>9.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=500, help='video pages per stage')
+    parser.add_argument('--searches', type=int, default=50)
+    parser.add_argument('--call-latency-ms', type=float, default=2.0, help='delay per fake WebDriver call')
+    parser.add_argument('--batch-size', type=int, default=50)
+    args = parser.parse_args()
+
+    video_page = load_capture("video_page.json")
+    search_page = load_capture("search_page.json")
+    driver = FakeDriver(video_page, search_page, args.call_latency_ms / 1000)
+    urls = [f"https://www.bitchute.com/video/bench{i:06d}/" for i in range(args.pages)]
+
+    print(f"{'stage':<28} {'calls':>6} {'p50 ms':>9} {'p95 ms':>9} {'pages/min':>12} {'wd calls':>9} {'peak MB':>9}")
+
+    driver.calls = 0
+    latencies, _ = timed(scraper.search_videos, [(driver, f"query {i}") for i in range(args.searches)])
+    report("search_videos", latencies, calls=driver.calls)
+
+    videos = None
+    for mode in ["elements", "script"]:
+        scraper.EXTRACTION_MODE = mode
+        driver.calls = 0
+        latencies, results = timed(scraper.get_video_data, [(driver, url) for url in urls])
+        report(f"get_video_data ({mode})", latencies, calls=driver.calls)
+        videos = videos or results
+
+    server, base_url = start_fixture_server(video_page["html"])
+    try:
+        session = http_scraper.get_session()
+        latencies, _ = timed(http_scraper.fetch_video_data_http, [(f"{base_url}/video/bench{i:06d}/", session) for i in range(args.pages)])
+        report("http_fetch", latencies)
+    finally:
+        server.shutdown()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        db.DB_PATH = os.path.join(scratch, "bench.db")
+        create_db()
+        latencies, _ = timed(process_video_data, [(dict(video),) for video in videos])
+        report("process_video_data", latencies)
+
+        # Second sample hour for the same videos: the refresh path, as updates
+        records = [video_record(dict(video)) for video in videos]
+        for record in records:
+            record["sample_time"] = to_hour(datetime(2000, 1, 1))
+        batches = [(records[i:i + args.batch_size],) for i in range(0, len(records), args.batch_size)]
+        latencies, _ = timed(write_video_batch, batches)
+        report(f"write_video_batch ({args.batch_size}/tx)", latencies, pages=len(records))
+        db.close_connections()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Generates a synthetic catalog database with the same schema, triggers and derived tables as bitchute.db.
+
+- Channel sizes follow a Zipf distribution, so a few channels hold a large share of the videos.
+- Uploads are spread over the last --days days.
+- View counts are log-normal; likes, dislikes and comments are fractions of views.
+- Titles and hashtags are drawn from a fixed vocabulary, so full-text searches have realistic hit rates.
+- --trend-videos of the videos get trend history. It is sampled at the times the refresh
+  scheduler would have visited them: hourly while new, thinning out as they age. Counts grow
+  towards the video's current totals.
+
+Tables are bulk loaded with the triggers dropped. The full-text index, channel rollup and
+refresh schedule are then rebuilt and the triggers restored, so the database behaves exactly
+like one the scraper filled.
+
+Usage:
+    python3 benchmarks/synthetic_catalog.py catalog_10k.db --videos 10000
+    python3 benchmarks/synthetic_catalog.py catalog_1m.db --videos 1000000 --trend-videos 20000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db
+from refresh_scheduler import refresh_interval
+from sql_operations import TREND_METRICS, create_db, rebuild_channel_rollup, suppress_flat_samples, to_hour
+
+# Words titles and hashtags are drawn from; the first ones are the most frequent
+COMMON_WORDS = ["news", "election", "report", "live", "update", "trump", "biden", "kamala", "debate", "breaking",
+                "world", "war", "economy", "health", "truth", "media", "interview", "analysis", "week", "today"]
+VOCABULARY = COMMON_WORDS + [f"topic{i}" for i in range(5000)]
+
+def sample_offsets(max_hours):
+    """
+    Lists the hours after upload at which the refresh scheduler would sample a video.
+
+    Parameters:
+        max_hours (int): The oldest age to cover.
+
+    Returns:
+        numpy.ndarray: Increasing whole-hour offsets, starting at 0.
+    """
+    offsets = [0]
+    while True:
+        age = offsets[-1]
+        step = max(1, int(round(refresh_interval(age))))
+        if age + step > max_hours:
+            return np.array(offsets)
+        offsets.append(age + step)
+
+def zipf_choice(rng, n, exponent, size):
+    """
+    Draws indexes in [0, n) with probability proportional to 1 / (index + 1) ** exponent.
+    """
+    weights = 1 / np.arange(1, n + 1) ** exponent
+    return rng.choice(n, size=size, p=weights / weights.sum())
+
+def words(rng, count, size):
+    """
+    Draws `count` rows of `size` words, favouring the start of VOCABULARY.
+    """
+    return [[VOCABULARY[i] for i in row] for row in zipf_choice(rng, len(VOCABULARY), 1.1, (count, size))]
+
+def generate(path, videos, channels, days, trend_videos, end, seed):
+    """
+    Writes a synthetic catalog to `path`.
+
+    Parameters:
+        path (str): The database file to create; it must not exist.
+        videos (int): The number of videos.
+        channels (int): The number of channels.
+        days (int): The length of the upload window, ending at `end`.
+        trend_videos (int): How many videos get trend history.
+        end (datetime.datetime): The time of the latest sample.
+        seed (int): The random seed.
+
+    Returns:
+        dict: Row counts of the generated tables.
+    """
+    rng = np.random.default_rng(seed)
+    db.DB_PATH = path
+    create_db()
+    conn = db.get_connection()
+    triggers = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'").fetchall()
+    for name, _ in triggers:
+        conn.execute(f"DROP TRIGGER {name}")
+    conn.execute("PRAGMA synchronous = OFF")
+
+    window_hours = days * 24
+    start = end - timedelta(hours=window_hours)
+    first_hour = to_hour(start)
+
+    channel_of = zipf_choice(rng, channels, 1.0, videos)
+    channel_names = [f"Channel {i}" for i in range(channels)]
+    upload_hour = rng.integers(0, window_hours, size=videos)
+    upload_minute = rng.integers(0, 60, size=videos)
+    views = rng.lognormal(mean=6, sigma=1.8, size=videos).astype(np.int64)
+    likes = (views * rng.uniform(0.005, 0.08, size=videos)).astype(np.int64)
+    dislikes = (likes * rng.uniform(0.01, 0.3, size=videos)).astype(np.int64)
+    comments = (views * rng.uniform(0.0005, 0.01, size=videos)).astype(np.int64)
+    integrity = rng.integers(1, 101, size=videos)
+    titles = words(rng, videos, 6)
+    tags = words(rng, videos, 3)
+    tag_counts = rng.integers(0, 4, size=videos)
+
+    def video_rows():
+        for i in range(videos):
+            uploaded = start + timedelta(hours=int(upload_hour[i]), minutes=int(upload_minute[i]))
+            yield (" ".join(titles[i]).capitalize(), f"https://www.bitchute.com/video/synthetic{i:07d}/",
+                   int(views[i]), int(likes[i]), int(dislikes[i]),
+                   f"https://www.bitchute.com/channel/synthetic{channel_of[i]:06d}", channel_names[channel_of[i]],
+                   int(comments[i]), uploaded.strftime('%Y-%m-%d %H:%M:%S'), json.dumps(tags[i][:tag_counts[i]]), int(integrity[i]))
+
+    with conn:
+        conn.executemany('''INSERT INTO videos (video_title, video_url, video_views, video_likes, video_dislikes, video_channel_url,
+                            video_channel_name, video_comments_count, video_upload_date, video_hashtags, video_info_integrity_score)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''', video_rows())
+
+    offsets = sample_offsets(window_hours)
+    with_history = rng.choice(videos, size=min(trend_videos, videos), replace=False)
+    totals = {'views': views, 'likes': likes, 'dislikes': dislikes, 'comments': comments}
+
+    def sample_rows():
+        for i in with_history:
+            first = int(upload_hour[i]) + 1
+            video_offsets = offsets[offsets <= window_hours - first]
+            # Counts approach the video's current totals with a per-video time constant
+            growth = 1 - np.exp(-(video_offsets + 1) / rng.uniform(6, 240))
+            growth /= growth[-1]
+            for metric in TREND_METRICS:
+                counts = (totals[metric][i] * growth).astype(np.int64)
+                for offset, count in zip(video_offsets, counts):
+                    yield (int(i) + 1, metric, first_hour + first + int(offset), int(count))
+
+    with conn:
+        conn.executemany('INSERT INTO trend_samples (video_id, metric, t, c) VALUES (?, ?, ?, ?)', sample_rows())
+
+    with conn:
+        conn.execute("INSERT INTO videos_fts (videos_fts) VALUES ('rebuild')")
+        conn.execute('''INSERT OR IGNORE INTO refresh_schedule (video_id, next_refresh)
+                        SELECT video_id, ? FROM videos''', (end.strftime('%Y-%m-%d %H:%M:%S'),))
+        for _, sql in triggers:
+            conn.execute(sql)
+    # As the writer would have
+    suppress_flat_samples()
+    rebuild_channel_rollup()
+    conn.execute("PRAGMA synchronous = NORMAL")
+
+    counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+              for table in ["videos", "channels", "trend_samples", "channel_trend_samples"]}
+    db.close_connections()
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('path')
+    parser.add_argument('--videos', type=int, default=10000)
+    parser.add_argument('--channels', type=int, help='default: one per 30 videos')
+    parser.add_argument('--days', type=int, default=90, help='upload and trend window (default: 90)')
+    parser.add_argument('--trend-videos', type=int, default=10000, help='videos with trend history (default: 10000)')
+    parser.add_argument('--end', default='2024-12-01 00:00:00', help='time of the latest sample, UTC')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    if os.path.exists(args.path):
+        parser.error(f"{args.path} already exists")
+    started = time.perf_counter()
+    counts = generate(args.path, args.videos, args.channels or max(1, args.videos // 30), args.days,
+                      args.trend_videos, datetime.strptime(args.end, '%Y-%m-%d %H:%M:%S'), args.seed)
+    print(", ".join(f"{table}: {count}" for table, count in counts.items()),
+          f"in {time.perf_counter() - started:.0f}s ({os.path.getsize(args.path) / 2 ** 20:.0f} MB)")
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,174 @@
+from functools import lru_cache
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 
-def setup_browser():
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/128.0.0.0 Safari/537.36'
+
+@lru_cache(maxsize=None)
+def resolve_driver_path():
+    """
+    Resolves the ChromeDriver binary once per process.
+
+    ChromeDriverManager checks versions and the download cache on every install()
+    call, so the resolved path is reused for every browser started afterwards.
+
+    Returns:
+        str: The path to the ChromeDriver binary.
+    """
+    return ChromeDriverManager().install()
+
+def setup_browser(mode=None, allow=None):
     """
     Sets up a headless Chrome WebDriver with specified options.
 
+    In "lean" mode the browser does not download the resource categories of
+    BLOCKED_RESOURCES (images, media, fonts, ad and tracker domains) that are not
+    allowed, since the scrapers only read text from the page.
+
+    Parameters:
+        mode (str): "lean" or "full"; defaults to BROWSER_MODE.
+        allow (list): BLOCKED_RESOURCES categories to load anyway; defaults to BROWSER_ALLOW.
+
     Returns:
         webdriver.Chrome: An instance of the Chrome WebDriver with configured options.
     """
+    mode = mode or BROWSER_MODE
+    allow = BROWSER_ALLOW if allow is None else allow
+    blocked = [category for category in BLOCKED_RESOURCES if category not in allow] if mode == "lean" else []
+
     options = webdriver.ChromeOptions()
     options.add_argument("--headless")
-    options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/128.0.0.0 Safari/537.36')
+    options.add_argument(f'user-agent={USER_AGENT}')
     options.add_argument("window-size=1920,1080")
     options.add_argument("disable-blink-features=AutomationControlled")
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
+    if "images" in blocked:
+        # Also covers images the URL patterns miss (extensionless CDN URLs, CSS backgrounds)
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
     
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    driver = webdriver.Chrome(service=Service(resolve_driver_path()), options=options)
+    if blocked:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": [pattern for category in blocked for pattern in BLOCKED_RESOURCES[category]]})
     return driver
+
+
+# Number of browser workers used to refresh the catalog in parallel
+SCRAPER_WORKERS = 4
+
+# Time budget, in seconds, for one refresh cycle
+CYCLE_BUDGET_SECONDS = 3600
+
+# Seconds to wait for the elements a page needs before giving up on it
+PAGE_READY_TIMEOUT = 20
+
+# Seconds to wait for an element revealed by an interaction (e.g. the upload date tooltip)
+ELEMENT_TIMEOUT = 5
+
+# How video pages are fetched: "http" parses the served HTML and only opens a
+# browser for fields it cannot resolve, "browser" always renders with Selenium.
+# Stays on "browser" until the HTTP path has been checked against live pages
+FETCH_MODE = "browser"
+
+# Seconds before an HTTP page request is abandoned
+HTTP_TIMEOUT = 15
+
+# Keep-alive connections per host for each HTTP session
+HTTP_POOL_SIZE = 10
+
+# A pooled browser is restarted after this many pages...
+DRIVER_MAX_PAGES = 200
+
+# ...or once Chrome and its child processes use more than this many MB of RSS
+DRIVER_MAX_RSS_MB = 1500
+
+# Video pages the refresh scheduler may fetch per hour, across all workers
+REFRESH_PAGES_PER_HOUR = 600
+
+# Most pages fetched in one scheduler batch; unused budget accumulates up to this
+REFRESH_BATCH_SIZE = 40
+
+# Bounds, in hours, of a video's refresh interval
+REFRESH_MIN_HOURS = 1
+REFRESH_MAX_HOURS = 168
+
+# View growth, in views per hour, that halves a video's refresh interval
+REFRESH_VELOCITY_VIEWS = 100
+
+# Longest the scheduler sleeps before checking the queue again
+REFRESH_IDLE_SECONDS = 300
+
+# Search queries the discovery frontier starts from and revisits
+DISCOVERY_SEED_QUERIES = ["biden", "trump", "us elections", "kamala"]
+
+# Seconds between discovery cycles
+DISCOVERY_INTERVAL_SECONDS = 3600
+
+# Pages (searches plus new video pages) one discovery cycle may fetch
+DISCOVERY_PAGES_PER_CYCLE = 50
+
+# Hours before a search query or hashtag is searched again for newer videos
+DISCOVERY_REVISIT_HOURS = 24
+
+# Hours before a new video whose page failed to scrape is tried again
+DISCOVERY_RETRY_HOURS = 6
+
+# Scraped videos that may wait for the database writer before scrapers block
+INGEST_QUEUE_SIZE = 200
+
+# The writer commits once per this many videos...
+INGEST_BATCH_SIZE = 50
+
+# ...or once the oldest waiting video has waited this many seconds
+INGEST_FLUSH_SECONDS = 2
+
+# How browsers load pages: "lean" skips the BLOCKED_RESOURCES categories, "full" loads everything
+BROWSER_MODE = "lean"
+
+# BLOCKED_RESOURCES categories a lean browser still loads, e.g. ["fonts"]
+BROWSER_ALLOW = []
+
+# URL patterns (Chrome DevTools wildcards) of each resource category a lean browser can block
+BLOCKED_RESOURCES = {
+    "images": ["*.jpg*", "*.jpeg*", "*.png*", "*.gif*", "*.webp*", "*.svg*", "*.ico"],
+    "media": ["*.mp4*", "*.webm*", "*.m3u8*", "*.m4s*", "*.mp3*", "*.aac*"],
+    "fonts": ["*.woff*", "*.ttf*", "*.otf*", "*fonts.googleapis.com*", "*fonts.gstatic.com*"],
+    "ads": ["*doubleclick.net*", "*googlesyndication.com*", "*googleadservices.com*", "*google-analytics.com*",
+            "*googletagmanager.com*", "*amazon-adsystem.com*", "*adnxs.com*", "*scorecardresearch.com*",
+            "*revcontent.com*", "*mgid.com*"],
+}
+
+# Measure the bytes each scraped page transferred (one extra script call per page)
+REPORT_PAGE_BYTES = True
+
+# How get_video_data reads a loaded page: "script" gathers every field in one script call,
+# "elements" reads each field with its own WebDriver call
+EXTRACTION_MODE = "script"
+
+# Record per-stage latencies, field failures and cycle summaries; when off, instrumented
+# functions are left unwrapped
+TELEMETRY_ENABLED = True
+
+# Prometheus text file the scraper rewrites after every cycle, read by the ops page
+METRICS_PATH = "scraper_metrics.prom"
+
+# Upper bounds of the stage latency histogram buckets, in seconds
+LATENCY_BUCKETS = [0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60]
+
+# Publish an Arrow snapshot of the videos, channels and trend samples after every cycle, from a
+# background thread, and serve the dashboard from it instead of querying SQLite per session
+SNAPSHOT_ENABLED = True
+
+# Directory the snapshots are published to; the dashboard must be able to read it
+SNAPSHOT_DIR = "snapshot"
+
+# Rows read from SQLite and written per Arrow record batch while exporting
+SNAPSHOT_BATCH_ROWS = 100000
+
+# Trend history keeps every hourly sample for this many days, then one point per day...
+TREND_HOURLY_DAYS = 14
+
+# ...until it is this many days old, then one point per week
+TREND_DAILY_DAYS = 90
@@ -0,0 +1,124 @@
+import logging
+from datetime import datetime, timedelta
+from config import (SCRAPER_WORKERS, DISCOVERY_SEED_QUERIES, DISCOVERY_PAGES_PER_CYCLE,
+                    DISCOVERY_REVISIT_HOURS, DISCOVERY_RETRY_HOURS)
+from process_data import process_video_data
+from scrape_pool import scrape_in_parallel
+from scraper import search_videos, search_hashtag_videos
+from sql_operations import (fetch_video_url_list, add_frontier_entries, fetch_due_frontier, fetch_frontier_values,
+                            reschedule_frontier_entries, remove_frontier_entries)
+
+logger = logging.getLogger(__name__)
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# How each kind of search term is looked up
+SEARCHES = {
+    'query': search_videos,
+    'hashtag': search_hashtag_videos,
+}
+
+def _time(hours=0):
+    """
+    Returns the UTC time `hours` from now in 'YYYY-MM-DD HH:MM:SS' format.
+    """
+    return (datetime.utcnow() + timedelta(hours=hours)).strftime(TIME_FORMAT)
+
+class CrawlFrontier:
+    """
+    Finds new videos from a persistent frontier of search queries, hashtags and unscraped video URLs.
+
+    The frontier lives in the database so discovery resumes where it left off after a restart.
+    Every video URL already in the catalog or the frontier is held in memory, so search results
+    are deduplicated without a database lookup per URL.
+    """
+
+    def __init__(self, seed_queries=DISCOVERY_SEED_QUERIES):
+        add_frontier_entries('query', seed_queries, _time())
+        self.known_urls = set(fetch_video_url_list())
+        self.known_urls.update(fetch_frontier_values('video'))
+
+    def add_videos(self, urls):
+        """
+        Queues the video URLs that have not been seen before.
+
+        Parameters:
+            urls (list): Video URLs from a search.
+
+        Returns:
+            list: The URLs that were new.
+        """
+        new_urls = [url for url in dict.fromkeys(urls) if url and url not in self.known_urls]
+        if new_urls:
+            add_frontier_entries('video', new_urls, _time())
+            self.known_urls.update(new_urls)
+        return new_urls
+
+    def add_hashtags(self, hashtags):
+        """
+        Queues hashtags to search; hashtags already in the frontier keep their schedule.
+
+        Parameters:
+            hashtags (list): Hashtags found on a scraped video.
+        """
+        hashtags = [hashtag for hashtag in hashtags if hashtag]
+        if hashtags:
+            add_frontier_entries('hashtag', hashtags, _time())
+
+    def _search(self, driver_pool, kind, term):
+        """
+        Runs one frontier search and queues the new videos it finds.
+
+        Returns:
+            list: The new video URLs.
+        """
+        try:
+            urls = driver_pool.run(SEARCHES[kind], term)
+        except Exception as e:
+            logger.warning("Failed to search %s %r: %r", kind, term, e)
+            reschedule_frontier_entries(kind, [term], _time(DISCOVERY_RETRY_HOURS))
+            return []
+        reschedule_frontier_entries(kind, [term], _time(DISCOVERY_REVISIT_HOURS))
+        return self.add_videos(urls)
+
+    def discover(self, driver_pool, scrape, save=process_video_data, pages=DISCOVERY_PAGES_PER_CYCLE, workers=SCRAPER_WORKERS):
+        """
+        Runs one discovery cycle within a page budget.
+
+        Queued videos are scraped first. Due queries and then due hashtags are searched only while the
+        budget still has room to scrape what they find. Hashtags on every newly scraped video are
+        added to the frontier, so discovery spreads beyond the seed queries.
+
+        Parameters:
+            driver_pool (DriverPool): The pool of warm browsers to scrape with.
+            scrape (callable): The video scraping function, called as scrape(driver, url).
+            save (callable): Stores a scraped video, called as save(video_data); e.g. BatchWriter.submit.
+            pages (int): The most pages (searches plus video pages) the cycle may fetch.
+            workers (int): The number of workers to scrape with.
+
+        Returns:
+            dict: The scrape_in_parallel report for the new videos, with the number of searches run.
+        """
+        now = _time()
+        candidates = fetch_due_frontier('video', now, pages)
+        searches = 0
+        for kind in SEARCHES:
+            for term in fetch_due_frontier(kind, now, pages):
+                if searches + len(candidates) >= pages:
+                    break
+                candidates += self._search(driver_pool, kind, term)
+                searches += 1
+        candidates = candidates[:max(pages - searches, 0)]
+
+        def handle_result(video_data):
+            save(video_data)
+            self.add_hashtags(video_data.get('video_hashtags') or [])
+
+        report = scrape_in_parallel(candidates, scrape, handle_result, driver_pool, workers=workers)
+        remove_frontier_entries('video', [url for url in candidates if url not in report['failures']])
+        reschedule_frontier_entries('video', list(report['failures']), _time(DISCOVERY_RETRY_HOURS))
+
+        report['searches'] = searches
+        logger.info("Discovery ran %d searches and added %d new videos; %d known URLs",
+                    searches, report['succeeded'], len(self.known_urls))
+        return report
@@ -0,0 +1,327 @@
+import pandas as pd
+from datetime import datetime
+from config import SNAPSHOT_ENABLED
+from downsample import downsample_frame
+from query_cache import cached_query
+from snapshot import load_snapshot
+from sql_operations import TREND_METRICS, build_search_match, fetch_channel_rollup, fetch_channel_samples, fetch_trend, search_video_ids, to_hour
+from telemetry import histogram_quantile
+from trend_aggregation import aggregate_channel_samples
+
+# Integrity score ranges used by every histogram on the dashboard
+INTEGRITY_BINS = [0, 25, 50, 75, 100]
+INTEGRITY_LABELS = ["1-25", "26-50", "51-75", "76-100"]
+
+def fetch_search_frame(query=""):
+    """
+    Fetches the chart columns of every video matching the search in a single query.
+
+    All the dashboard's charts are derived from this frame in memory, so the videos table is scanned
+    once per search instead of once per chart. The tables are paged separately (fetch_video_page,
+    fetch_channel_page), so the frame carries only the numeric columns the charts need. When a
+    snapshot is published the frame is built from it, with the search still run on the full-text
+    index; otherwise the result is cached until the scraper next writes to the database.
+
+    Parameters:
+        query (str): Search text matched against video titles and hashtags.
+
+    Returns:
+        pandas.DataFrame: One row per video with Integrity_Score, Views, Likes, Dislikes, Comments,
+        Channel and Channel_Url. The frame is shared through the cache and must not be modified.
+    """
+    snapshot = load_snapshot() if SNAPSHOT_ENABLED else None
+    if snapshot is not None:
+        return snapshot.search_frame(search_video_ids(query, ranked=False) if build_search_match(query) else None)
+
+    match = build_search_match(query)
+    search_filter = "WHERE video_id IN (SELECT rowid FROM videos_fts WHERE videos_fts MATCH :match)" if match else ""
+    sql = f'SELECT video_info_integrity_score AS Integrity_Score, video_views AS Views, video_likes AS Likes, video_dislikes AS Dislikes, video_comments_count AS Comments, video_channel_name AS Channel, video_channel_url AS Channel_Url FROM videos {search_filter}'
+    return cached_query(sql, {"match": match} if match else None)
+
+# Sortable columns of the paginated tables, by the label shown in the sort selector
+VIDEO_SORTS = {"Views": "Views", "Upload date": "Upload_Date", "Integrity score": "Integrity_Score"}
+CHANNEL_SORTS = {"Views": "Views", "Integrity score": "Integrity_Score"}
+PAGE_SIZE = 50
+
+def _sql_value(value):
+    """
+    Converts a numpy scalar read back from a page into a value sqlite3 can bind.
+    """
+    return value.item() if hasattr(value, "item") else value
+
+def fetch_keyset_page(source_sql, params, sort_column, descending=True, cursor=None, page_size=PAGE_SIZE):
+    """
+    Fetches one page of rows ordered by a sort column, starting after a cursor.
+
+    The page is selected with a (sort value, Key) comparison rather than an OFFSET, so SQLite
+    seeks straight to the first row through the sort column's index and reads only the page.
+
+    Parameters:
+        source_sql (str): A SELECT whose rows have the sort column and a unique Key column.
+        params (dict): Named parameters of source_sql.
+        sort_column (str): The column to order by.
+        descending (bool): Largest values first when True.
+        cursor (tuple): (sort value, Key) of the last row of the previous page, or None for the first page.
+        page_size (int): Maximum number of rows on the page.
+
+    Returns:
+        tuple: The page as a pandas.DataFrame and the cursor of the next page, or None on the last page.
+    """
+    order = "DESC" if descending else "ASC"
+    keyset = ""
+    params = dict(params or {}, limit=page_size + 1)
+    if cursor is not None:
+        keyset = f"WHERE ({sort_column}, Key) {'<' if descending else '>'} (:cursor_value, :cursor_key)"
+        params.update(cursor_value=_sql_value(cursor[0]), cursor_key=_sql_value(cursor[1]))
+    sql = f"SELECT * FROM ({source_sql}) {keyset} ORDER BY {sort_column} {order}, Key {order} LIMIT :limit"
+    # One extra row tells whether there is a next page
+    rows = cached_query(sql, params)
+    page = rows.iloc[:page_size]
+    next_cursor = None
+    if len(rows) > page_size:
+        last = page.iloc[-1]
+        next_cursor = (_sql_value(last[sort_column]), _sql_value(last["Key"]))
+    return page, next_cursor
+
+def fetch_video_page(query="", sort="Views", descending=True, cursor=None, page_size=PAGE_SIZE):
+    """
+    Fetches one page of the videos matching the search.
+
+    Parameters:
+        query (str): Search text matched against video titles and hashtags.
+        sort (str): A VIDEO_SORTS label.
+        descending (bool): Largest values first when True.
+        cursor (tuple): The cursor returned with the previous page, or None for the first page.
+        page_size (int): Maximum number of rows on the page.
+
+    Returns:
+        tuple: The page and the next page's cursor. The page has the columns of fetch_search_frame
+        plus the Key (video_id) the cursor is built from.
+    """
+    match = build_search_match(query)
+    search_filter = "WHERE video_id IN (SELECT rowid FROM videos_fts WHERE videos_fts MATCH :match)" if match else ""
+    source_sql = f'SELECT video_id AS Key, video_title AS Title, video_upload_date AS Upload_Date, video_info_integrity_score AS Integrity_Score, video_url AS Url, video_channel_url AS Channel_Url, video_views AS Views, video_likes AS Likes, video_dislikes AS Dislikes, video_comments_count AS Comments, video_channel_name AS Channel, CASE WHEN video_hashtags = "[]" THEN "None" ELSE video_hashtags END AS Hashtags FROM videos {search_filter}'
+    return fetch_keyset_page(source_sql, {"match": match} if match else None, VIDEO_SORTS[sort], descending, cursor, page_size)
+
+def fetch_channel_page(query="", sort="Views", descending=True, cursor=None, page_size=PAGE_SIZE):
+    """
+    Fetches one page of the channels of the videos matching the search.
+
+    Without a search the page is read from the per-channel rollup through its sort indexes;
+    with one, the matching videos are totalled per channel first.
+
+    Parameters:
+        query (str): Search text matched against video titles and hashtags.
+        sort (str): A CHANNEL_SORTS label.
+        descending (bool): Largest values first when True.
+        cursor (tuple): The cursor returned with the previous page, or None for the first page.
+        page_size (int): Maximum number of rows on the page.
+
+    Returns:
+        tuple: The page and the next page's cursor. The page has the columns of channel_summary
+        plus the Key the cursor is built from.
+    """
+    match = build_search_match(query)
+    if match:
+        source_sql = "SELECT video_channel_url AS Key, MAX(video_channel_name) AS Channel, AVG(video_info_integrity_score) AS Integrity_Score, SUM(video_views) AS Views, SUM(video_likes) AS Likes, SUM(video_dislikes) AS Dislikes, SUM(video_comments_count) AS Comments, video_channel_url AS Url FROM videos WHERE video_id IN (SELECT rowid FROM videos_fts WHERE videos_fts MATCH :match) GROUP BY video_channel_url"
+        params = {"match": match}
+    else:
+        source_sql = "SELECT rowid AS Key, channel_name AS Channel, CAST(integrity_score_sum AS REAL) / video_count AS Integrity_Score, views AS Views, likes AS Likes, dislikes AS Dislikes, comments AS Comments, channel_url AS Url FROM channels WHERE video_count > 0"
+        params = None
+    return fetch_keyset_page(source_sql, params, CHANNEL_SORTS[sort], descending, cursor, page_size)
+
+def channel_summary(videos):
+    """
+    Aggregates the videos of a search frame per channel.
+
+    Parameters:
+        videos (pandas.DataFrame): A frame from fetch_search_frame.
+
+    Returns:
+        pandas.DataFrame: One row per channel with Channel, Integrity_Score (average), Views, Likes,
+        Dislikes, Comments (totals) and Url.
+    """
+    channels = videos.groupby(["Channel", "Channel_Url"], as_index=False, sort=True).agg(
+        Integrity_Score=("Integrity_Score", "mean"),
+        Views=("Views", "sum"),
+        Likes=("Likes", "sum"),
+        Dislikes=("Dislikes", "sum"),
+        Comments=("Comments", "sum"),
+    )
+    return channels.rename(columns={"Channel_Url": "Url"})[["Channel", "Integrity_Score", "Views", "Likes", "Dislikes", "Comments", "Url"]]
+
+def integrity_ranges(scores):
+    """
+    Assigns integrity scores to the dashboard's score ranges.
+
+    Parameters:
+        scores (pandas.Series): Integrity scores between 1 and 100.
+
+    Returns:
+        pandas.Series: The range label ("1-25", ...) of each score.
+    """
+    return pd.cut(scores, bins=INTEGRITY_BINS, labels=INTEGRITY_LABELS)
+
+def integrity_histogram(frame, count_label):
+    """
+    Counts the rows of a frame in each integrity score range.
+
+    Parameters:
+        frame (pandas.DataFrame): A frame with an Integrity_Score column.
+        count_label (str): The name of the count column, e.g. "Videos_Count".
+
+    Returns:
+        pandas.DataFrame: Integrity_Score range and count, for the ranges that have rows.
+    """
+    counts = integrity_ranges(frame["Integrity_Score"]).value_counts(sort=False)
+    counts = counts[counts > 0]
+    return pd.DataFrame({"Integrity_Score": counts.index.astype(str), count_label: counts.to_numpy()})
+
+def views_likes_by_integrity(videos):
+    """
+    Totals views and likes per integrity score range.
+
+    Parameters:
+        videos (pandas.DataFrame): A frame from fetch_search_frame.
+
+    Returns:
+        pandas.DataFrame: Integrity_Score range, Total_Views and Total_Likes, for the ranges that have videos.
+    """
+    totals = videos.groupby(integrity_ranges(videos["Integrity_Score"]), observed=True)[["Views", "Likes"]].sum()
+    return pd.DataFrame({
+        "Integrity_Score": totals.index.astype(str),
+        "Total_Views": totals["Views"].to_numpy(),
+        "Total_Likes": totals["Likes"].to_numpy(),
+    })
+
+def trend_frame(trend, start_date, end_date):
+    """
+    Prepares a trend series for a chart, downsampled to the chart's point budget.
+
+    Parameters:
+        trend (list or pandas.DataFrame): A list of {'t', 'c'} points with t in hours since the epoch,
+            as the database stores it (see sql_operations.to_hour), or a frame with t and c columns.
+        start_date (datetime.date): The start date of the plotted range.
+        end_date (datetime.date): The end date of the plotted range.
+
+    Returns:
+        pandas.DataFrame: Columns t (datetime) and c.
+    """
+    df = pd.DataFrame(trend, columns=['t', 'c'])
+    if pd.api.types.is_integer_dtype(df['t']):
+        df['t'] = pd.to_datetime(df['t'], unit='h').astype('datetime64[ns]')
+    else:
+        df['t'] = pd.to_datetime(df['t'])
+    return downsample_frame(df, start_date, end_date)
+
+def fetch_video_trend(video_url, metric, start_date, end_date):
+    """
+    Fetches one trend series of a video within a date range.
+
+    Reads the published snapshot, and falls back to the database for videos it does not hold yet.
+
+    Parameters:
+        video_url (str): The URL of the video.
+        metric (str): The metric name (see TREND_METRICS).
+        start_date (datetime.date): The first day to include.
+        end_date (datetime.date): The last day to include.
+
+    Returns:
+        pandas.DataFrame or list: The t and c points, in either form trend_frame accepts.
+    """
+    snapshot = load_snapshot() if SNAPSHOT_ENABLED else None
+    trend = snapshot.trend('video', video_url, metric, start_date, end_date) if snapshot is not None else None
+    if trend is None:
+        return fetch_trend('video', video_url, metric, start_date, end_date)
+    return trend
+
+def fetch_channel_trends(channel_url, start_date, end_date):
+    """
+    Fetches a channel's trend series within a date range.
+
+    Reads the precomputed rollup, from the published snapshot when it holds the channel, and only
+    aggregates the videos' own samples when the channel is missing from the rollup.
+
+    Parameters:
+        channel_url (str): The URL of the channel.
+        start_date (datetime.date): The start date for filtering data.
+        end_date (datetime.date): The end date for filtering data.
+
+    Returns:
+        dict: A dictionary mapping each metric name to its points, in either form trend_frame accepts.
+    """
+    snapshot = load_snapshot() if SNAPSHOT_ENABLED else None
+    if snapshot is not None:
+        trends = {metric: snapshot.trend('channel', channel_url, metric, start_date, end_date) for metric in TREND_METRICS}
+        if all(trend is not None for trend in trends.values()):
+            return trends
+    if fetch_channel_rollup(channel_url) is None:
+        start = to_hour(datetime.combine(start_date, datetime.min.time()))
+        aggregated = aggregate_channel_samples(fetch_channel_samples(channel_url, start_date, end_date), start)
+        return {metric: aggregated[column] for metric, column in TREND_METRICS.items()}
+    return {metric: fetch_trend('channel', channel_url, metric, start_date, end_date) for metric in TREND_METRICS}
+
+def scrape_metrics_frames(samples):
+    """
+    Arranges the scraper's exported metrics into the tables of the ops page.
+
+    Parameters:
+        samples (list): (name, labels, value) tuples from telemetry.read_metrics.
+
+    Returns:
+        dict: DataFrames keyed 'stages' (latency percentiles and page sizes per stage), 'fields' (found and
+        missing counts per field), 'timeouts' (element waits that timed out, per XPath),
+        'cycles' (the latest cycle of each kind) and 'writer' (BatchWriter metrics).
+    """
+    buckets, stages, failures, fields, timeouts, cycles, writer, page_bytes = {}, {}, {}, {}, {}, {}, {}, {}
+    for name, labels, value in samples:
+        if name == "scrape_stage_seconds_bucket":
+            buckets.setdefault(labels["stage"], []).append((float(labels["le"]), value))
+        elif name in ("scrape_stage_seconds_sum", "scrape_stage_seconds_count"):
+            stages.setdefault(labels["stage"], {})[name.rsplit("_", 1)[1]] = value
+        elif name == "scrape_stage_failures_total":
+            failures[labels["stage"]] = failures.get(labels["stage"], 0) + value
+        elif name == "scrape_fields_total":
+            fields.setdefault((labels["field"], labels["source"]), {})[labels["outcome"]] = value
+        elif name in ("scrape_page_bytes_total", "scrape_pages_measured_total"):
+            page_bytes.setdefault(labels["stage"], {})[name] = value
+        elif name == "scrape_wait_timeouts_total":
+            timeouts[labels["xpath"]] = value
+        elif name == "scrape_cycle_last":
+            cycles.setdefault(labels["kind"], {})[labels["field"]] = value
+        elif name in ("scrape_cycles_total", "scrape_cycle_overruns_total"):
+            cycles.setdefault(labels["kind"], {})[name[len("scrape_"):-len("_total")]] = value
+        elif name == "ingest_writer":
+            writer[labels["field"]] = value
+
+    stage_rows = []
+    for stage, totals in stages.items():
+        ordered = sorted(buckets.get(stage, []))
+        calls = totals.get("count", 0)
+        measured = page_bytes.get(stage, {})
+        pages = measured.get("scrape_pages_measured_total", 0)
+        stage_rows.append({
+            "Stage": stage,
+            "Calls": int(calls),
+            "Failures": int(failures.get(stage, 0)),
+            "Mean_ms": 1000 * totals.get("sum", 0) / calls if calls else None,
+            "P50_ms": 1000 * (histogram_quantile(0.5, ordered) or 0),
+            "P95_ms": 1000 * (histogram_quantile(0.95, ordered) or 0),
+            "Total_s": totals.get("sum", 0),
+            "Mean_KB": measured.get("scrape_page_bytes_total", 0) / pages / 1024 if pages else None,
+        })
+
+    field_rows = [{"Field": field, "Source": source, "Found": int(counts.get("found", 0)), "Missing": int(counts.get("missing", 0))}
+                  for (field, source), counts in sorted(fields.items())]
+    cycles_frame = pd.DataFrame([{"Kind": kind, **summary} for kind, summary in sorted(cycles.items())],
+                                columns=["Kind", "finished_timestamp", "pages", "succeeded", "failed", "searches",
+                                         "duration_seconds", "budget_seconds", "overran", "cycles", "cycle_overruns"])
+    cycles_frame["finished_timestamp"] = pd.to_datetime(cycles_frame["finished_timestamp"], unit="s", utc=True)
+
+    return {
+        "stages": pd.DataFrame(stage_rows, columns=["Stage", "Calls", "Failures", "Mean_ms", "P50_ms", "P95_ms", "Total_s", "Mean_KB"]).sort_values("Total_s", ascending=False),
+        "fields": pd.DataFrame(field_rows, columns=["Field", "Source", "Found", "Missing"]),
+        "timeouts": pd.DataFrame([(xpath, int(value)) for xpath, value in sorted(timeouts.items(), key=lambda item: -item[1])], columns=["XPath", "Timeouts"]),
+        "cycles": cycles_frame,
+        "writer": pd.DataFrame(sorted(writer.items()), columns=["Metric", "Value"]),
+    }
\ No newline at end of file
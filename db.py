@@ -0,0 +1,70 @@
+import sqlite3
+import threading
+
+DB_PATH = 'bitchute.db'
+
+# Applied to every connection. WAL lets the dashboard read while the scraper writes;
+# synchronous=NORMAL is durable under WAL except across power loss of the last commits.
+PRAGMAS = [
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -65536",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA temp_store = MEMORY",
+]
+
+_local = threading.local()
+
+def _configure(conn):
+    """
+    Applies the shared pragmas to a new connection.
+
+    Parameters:
+        conn (sqlite3.Connection): The connection to configure.
+    """
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+
+def get_connection():
+    """
+    Returns this thread's read-write connection, opening it on first use.
+
+    The first connection switches the database to WAL journaling, which is persistent,
+    so readers in other processes no longer block on the scraper's writes.
+
+    Returns:
+        sqlite3.Connection: A connection that is reused by every call on this thread.
+    """
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH)
+        conn.execute("PRAGMA journal_mode = WAL")
+        _configure(conn)
+        _local.conn = conn
+    return conn
+
+def get_read_connection():
+    """
+    Returns this thread's read-only connection, opening it on first use.
+
+    Used by the Streamlit pages, which must never take a write lock.
+
+    Returns:
+        sqlite3.Connection: A read-only connection that is reused by every call on this thread.
+    """
+    conn = getattr(_local, 'read_conn', None)
+    if conn is None:
+        conn = sqlite3.connect(f'file:{DB_PATH}?mode=ro', uri=True)
+        _configure(conn)
+        _local.read_conn = conn
+    return conn
+
+def close_connections():
+    """
+    Closes the connections opened by the current thread.
+    """
+    for name in ('conn', 'read_conn'):
+        conn = getattr(_local, name, None)
+        if conn is not None:
+            conn.close()
+            setattr(_local, name, None)
\ No newline at end of file
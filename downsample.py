@@ -0,0 +1,114 @@
+import numpy as np
+
+# Plot width assumed for a chart in the wide page layout, and the pixels each point needs
+CHART_WIDTH_PX = 1200
+PIXELS_PER_POINT = 2
+
+def point_budget(start_date, end_date, width=CHART_WIDTH_PX):
+    """
+    Decides how many points a trend chart should receive.
+
+    The budget follows the chart width, but never exceeds the number of hourly
+    samples the selected range can hold, so short ranges keep full resolution.
+
+    Parameters:
+        start_date (datetime.date): The first day of the range.
+        end_date (datetime.date): The last day of the range.
+        width (int): The width of the chart in pixels.
+
+    Returns:
+        int: The maximum number of points to plot.
+    """
+    hours = ((end_date - start_date).days + 1) * 24
+    return max(3, min(width // PIXELS_PER_POINT, hours))
+
+def lttb(x, y, threshold):
+    """
+    Picks the points that best keep a series' visual shape (Largest-Triangle-Three-Buckets).
+
+    The first and last points are always kept. Every bucket in between contributes the
+    point forming the largest triangle with the previously kept point and the average
+    of the next bucket.
+
+    Parameters:
+        x (numpy.ndarray): Increasing x values (e.g. timestamps as numbers).
+        y (numpy.ndarray): The y values.
+        threshold (int): The number of points to keep.
+
+    Returns:
+        numpy.ndarray: The indices of the kept points, in order.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        average_x = x[next_start:next_end].mean()
+        average_y = y[next_start:next_end].mean()
+
+        areas = np.abs((x[previous] - average_x) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (average_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+    return selected
+
+def minmax_buckets(y, threshold):
+    """
+    Keeps the minimum, maximum and last point of each of threshold // 3 equal buckets.
+
+    Cheaper than LTTB and never hides a spike, at the cost of a less even spread.
+
+    Parameters:
+        y (numpy.ndarray): The y values.
+        threshold (int): The approximate number of points to keep.
+
+    Returns:
+        numpy.ndarray: The indices of the kept points, in order.
+    """
+    n = len(y)
+    buckets = max(1, threshold // 3)
+    if n <= threshold:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, buckets + 1).astype(int)
+    selected = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        if start == end:
+            continue
+        window = y[start:end]
+        selected.extend((start + int(np.argmin(window)), start + int(np.argmax(window)), end - 1))
+    return np.unique(selected)
+
+def downsample_frame(df, start_date, end_date, width=CHART_WIDTH_PX, method='lttb'):
+    """
+    Reduces a trend DataFrame to the point budget of its chart.
+
+    Parameters:
+        df (pandas.DataFrame): Time-ordered trend data with datetime column 't' and count column 'c'.
+        start_date (datetime.date): The first day of the selected range.
+        end_date (datetime.date): The last day of the selected range.
+        width (int): The width of the chart in pixels.
+        method (str): 'lttb' to preserve the shape, or 'minmax' to keep bucket extremes.
+
+    Returns:
+        pandas.DataFrame: The rows to plot; df itself when it already fits the budget.
+    """
+    budget = point_budget(start_date, end_date, width)
+    if len(df) <= budget:
+        return df
+
+    y = df['c'].to_numpy(dtype=float)
+    if method == 'minmax':
+        indices = minmax_buckets(y, budget)
+    else:
+        x = df['t'].to_numpy(dtype='datetime64[s]').astype(np.int64).astype(float)
+        indices = lttb(x, y, budget)
+    return df.iloc[indices]
\ No newline at end of file
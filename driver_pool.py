@@ -0,0 +1,200 @@
+import logging
+import threading
+from contextlib import contextmanager
+import psutil
+from selenium.common.exceptions import WebDriverException
+from config import setup_browser, SCRAPER_WORKERS, DRIVER_MAX_PAGES, DRIVER_MAX_RSS_MB
+
+logger = logging.getLogger(__name__)
+
+def browser_rss_mb(driver):
+    """
+    Measures the resident memory of a browser session: chromedriver plus every Chrome process under it.
+
+    Parameters:
+        driver (webdriver.Chrome): The WebDriver instance.
+
+    Returns:
+        float or None: The total RSS in MB, or None if it cannot be measured (e.g. the process is gone).
+    """
+    try:
+        process = psutil.Process(driver.service.process.pid)
+        processes = [process] + process.children(recursive=True)
+        return sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+    except (AttributeError, psutil.Error):
+        return None
+
+def is_alive(driver):
+    """
+    Checks whether a browser session still responds.
+
+    Parameters:
+        driver (webdriver.Chrome): The WebDriver instance.
+
+    Returns:
+        bool: False if the session or the browser has crashed.
+    """
+    try:
+        driver.current_url
+        return True
+    except WebDriverException:
+        return False
+
+class PooledDriver:
+    """
+    A warm browser session owned by a DriverPool, with the number of pages it has served.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+class LazyDriver:
+    """
+    Stands in for a WebDriver and only takes a browser from the pool the first time it is used.
+
+    Scrapers that usually manage without a browser (see http_scraper) then cost a
+    worker nothing unless they actually fall back to Selenium.
+    """
+
+    def __init__(self, acquire):
+        self._acquire = acquire
+        self.session = None
+
+    def __getattr__(self, name):
+        if self.session is None:
+            self.session = self._acquire()
+        return getattr(self.session.driver, name)
+
+class DriverPool:
+    """
+    Keeps up to `size` warm Chrome sessions alive across scrape cycles.
+
+    Sessions are handed out one at a time, restarted after DRIVER_MAX_PAGES pages or
+    once their memory passes DRIVER_MAX_RSS_MB, and replaced when they crash.
+    """
+
+    def __init__(self, size=SCRAPER_WORKERS, max_pages=DRIVER_MAX_PAGES, max_rss_mb=DRIVER_MAX_RSS_MB, driver_factory=setup_browser):
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self._driver_factory = driver_factory
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._idle = []
+
+    def acquire(self):
+        """
+        Takes a session from the pool, starting a new browser if none is idle.
+
+        Blocks while `size` sessions are already in use.
+
+        Returns:
+            PooledDriver: The session.
+        """
+        self._slots.acquire()
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        try:
+            return PooledDriver(self._driver_factory())
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, session):
+        """
+        Returns a session after it has served a page, recycling it if it is worn out.
+
+        Parameters:
+            session (PooledDriver): The session to return.
+        """
+        session.pages += 1
+        reason = None
+        if session.pages >= self.max_pages:
+            reason = f"{session.pages} pages"
+        elif self.max_rss_mb:
+            rss = browser_rss_mb(session.driver)
+            if rss is not None and rss > self.max_rss_mb:
+                reason = f"{rss:.0f} MB RSS"
+
+        if reason:
+            logger.info("Recycling browser after %s", reason)
+            self.discard(session)
+            return
+        with self._lock:
+            self._idle.append(session)
+        self._slots.release()
+
+    def discard(self, session):
+        """
+        Quits a session and frees its slot so a fresh browser can take its place.
+
+        Parameters:
+            session (PooledDriver): The session to throw away.
+        """
+        try:
+            session.driver.quit()
+        except Exception:
+            logger.debug("Error quitting browser", exc_info=True)
+        self._slots.release()
+
+    def run(self, scrape, url):
+        """
+        Scrapes a URL with a pooled browser, replacing the browser and retrying once if it crashed.
+
+        The browser is only taken from the pool if the scrape function actually uses it.
+
+        Parameters:
+            scrape (callable): The scraping function, called as scrape(driver, url).
+            url (str): The URL to scrape.
+
+        Returns:
+            The value returned by scrape.
+        """
+        for attempt in range(2):
+            driver = LazyDriver(self.acquire)
+            try:
+                return scrape(driver, url)
+            except WebDriverException:
+                if driver.session is not None and not is_alive(driver.session.driver):
+                    logger.warning("Browser crashed on %s, starting a new one", url)
+                    self.discard(driver.session)
+                    driver.session = None
+                    if attempt == 0:
+                        continue
+                raise
+            finally:
+                if driver.session is not None:
+                    self.release(driver.session)
+
+    @contextmanager
+    def driver(self):
+        """
+        Lends a pooled browser for the duration of a with block.
+
+        Yields:
+            webdriver.Chrome: The WebDriver instance.
+        """
+        session = self.acquire()
+        try:
+            yield session.driver
+        except WebDriverException:
+            if not is_alive(session.driver):
+                self.discard(session)
+                session = None
+            raise
+        finally:
+            if session is not None:
+                self.release(session)
+
+    def close(self):
+        """
+        Quits every idle browser in the pool.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for session in idle:
+            try:
+                session.driver.quit()
+            except Exception:
+                logger.debug("Error quitting browser", exc_info=True)
\ No newline at end of file
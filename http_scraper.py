@@ -0,0 +1,212 @@
+import json
+import logging
+import threading
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib.parse import urljoin
+from urllib3.util.retry import Retry
+from config import USER_AGENT, HTTP_TIMEOUT, HTTP_POOL_SIZE
+from scraper import get_video_data
+from telemetry import record_fields, stage, timed
+from utils import convert_iso_to_datetime
+
+logger = logging.getLogger(__name__)
+
+# Fields process_video_data needs; a page missing any of them goes through the browser
+VIDEO_DATA_FIELDS = [
+    "video_title",
+    "video_url",
+    "video_views",
+    "video_likes",
+    "video_dislikes",
+    "video_channel_url",
+    "video_channel_name",
+    "video_comments_count",
+    "video_upload_date",
+    "video_hashtags",
+]
+
+# schema.org interaction types and the video_data field each one fills
+INTERACTION_FIELDS = {
+    "WatchAction": "video_views",
+    "LikeAction": "video_likes",
+    "DislikeAction": "video_dislikes",
+    "CommentAction": "video_comments_count",
+}
+
+_local = threading.local()
+
+def get_session():
+    """
+    Returns this thread's HTTP session, creating it on first use.
+
+    Sessions keep connections alive between pages and retry transient server errors.
+
+    Returns:
+        requests.Session: A pooled session for the current thread.
+    """
+    session = getattr(_local, "session", None)
+    if session is None:
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+        session = requests.Session()
+        session.headers.update({"User-Agent": USER_AGENT})
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _local.session = session
+    return session
+
+def _to_int(value):
+    """
+    Converts a count such as 1234, '1,234' or '1234 views' to an int.
+
+    Parameters:
+        value (int or str): The raw count.
+
+    Returns:
+        int or None: The count, or None if it cannot be parsed.
+    """
+    try:
+        return int(str(value).replace(",", "").split()[0])
+    except (ValueError, IndexError):
+        return None
+
+def _find_video_object(soup):
+    """
+    Finds the schema.org VideoObject in the page's JSON-LD blocks.
+
+    Parameters:
+        soup (BeautifulSoup): The parsed page.
+
+    Returns:
+        dict or None: The VideoObject, or None if the page has none.
+    """
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string or "")
+        except ValueError:
+            continue
+        candidates = data if isinstance(data, list) else data.get("@graph", [data])
+        for candidate in candidates:
+            if isinstance(candidate, dict) and candidate.get("@type") == "VideoObject":
+                return candidate
+    return None
+
+def _meta_content(soup, name):
+    """
+    Reads a <meta> tag by its property or name attribute.
+
+    Parameters:
+        soup (BeautifulSoup): The parsed page.
+        name (str): The property or name, e.g. 'og:title'.
+
+    Returns:
+        str or None: The tag's content, or None if absent.
+    """
+    tag = soup.find("meta", attrs={"property": name}) or soup.find("meta", attrs={"name": name})
+    return tag.get("content") if tag else None
+
+@timed
+def parse_video_page(html, video_url):
+    """
+    Extracts video metadata from a served page without rendering it.
+
+    Fields come from the page's JSON-LD VideoObject, with OpenGraph tags as a
+    fallback for the title. Fields that cannot be resolved are left out.
+
+    Parameters:
+        html (str): The page HTML.
+        video_url (str): The URL the page was fetched from.
+
+    Returns:
+        dict: The resolved subset of the video data fields.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    video_data = {"video_url": video_url}
+
+    video_object = _find_video_object(soup) or {}
+
+    title = video_object.get("name") or _meta_content(soup, "og:title")
+    if title:
+        video_data["video_title"] = title.strip()
+
+    for statistic in video_object.get("interactionStatistic", []):
+        interaction = statistic.get("interactionType")
+        if isinstance(interaction, dict):
+            interaction = interaction.get("@type")
+        field = INTERACTION_FIELDS.get(str(interaction).rsplit("/", 1)[-1])
+        count = _to_int(statistic.get("userInteractionCount"))
+        if field and count is not None:
+            video_data[field] = count
+    if "video_comments_count" not in video_data and _to_int(video_object.get("commentCount")) is not None:
+        video_data["video_comments_count"] = _to_int(video_object["commentCount"])
+
+    author = video_object.get("author")
+    if isinstance(author, list):
+        author = author[0] if author else None
+    if isinstance(author, dict):
+        if author.get("url"):
+            # Matches the browser's hrefs, which carry no trailing slash
+            video_data["video_channel_url"] = urljoin(video_url, author["url"]).rstrip("/")
+        if author.get("name"):
+            video_data["video_channel_name"] = author["name"].strip()
+
+    if video_object.get("uploadDate"):
+        try:
+            video_data["video_upload_date"] = convert_iso_to_datetime(video_object["uploadDate"])
+        except ValueError:
+            logger.debug("Unparseable uploadDate %r on %s", video_object["uploadDate"], video_url)
+
+    if video_object:
+        keywords = video_object.get("keywords", [])
+        if isinstance(keywords, str):
+            keywords = keywords.split(",")
+        video_data["video_hashtags"] = [keyword.strip().lstrip("#") for keyword in keywords if keyword.strip()]
+
+    return video_data
+
+@timed
+def fetch_video_data_http(video_url, session=None):
+    """
+    Fetches a video page over HTTP and extracts as many fields as it can.
+
+    Parameters:
+        video_url (str): The URL of the video.
+        session (requests.Session): The session to use; defaults to this thread's pooled session.
+
+    Returns:
+        tuple: (video_data, missing) where video_data holds the resolved fields and
+        missing lists the fields that could not be resolved.
+    """
+    session = session or get_session()
+    with stage("http_scraper.get"):
+        response = session.get(video_url, timeout=HTTP_TIMEOUT)
+        response.raise_for_status()
+
+    video_data = parse_video_page(response.text, video_url)
+    missing = [field for field in VIDEO_DATA_FIELDS if field not in video_data]
+    record_fields([field for field in VIDEO_DATA_FIELDS if field in video_data], missing, source="http")
+    return video_data, missing
+
+def get_video_data_with_fallback(driver, video_url):
+    """
+    Retrieves video data over HTTP, rendering the page with Selenium only when needed.
+
+    Parameters:
+        driver (webdriver): The Selenium WebDriver instance, used only for the fallback.
+        video_url (str): The URL of the video to scrape data from.
+
+    Returns:
+        dict: A dictionary containing the video data, in the format of scraper.get_video_data.
+    """
+    try:
+        video_data, missing = fetch_video_data_http(video_url)
+    except requests.RequestException as e:
+        logger.info("HTTP fetch failed for %s (%s), using the browser", video_url, e)
+        return get_video_data(driver, video_url)
+
+    if missing:
+        logger.info("Could not resolve %s over HTTP for %s, using the browser", ", ".join(missing), video_url)
+        return get_video_data(driver, video_url)
+    return video_data
\ No newline at end of file
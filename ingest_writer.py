@@ -0,0 +1,150 @@
+import logging
+import queue
+import threading
+import time
+from config import INGEST_QUEUE_SIZE, INGEST_BATCH_SIZE, INGEST_FLUSH_SECONDS
+from db import close_connections
+from process_data import video_record
+from sql_operations import write_video_batch
+
+logger = logging.getLogger(__name__)
+
+# Queue markers: write what is pending now / write it and stop
+_FLUSH = object()
+_STOP = object()
+
+class BatchWriter:
+    """
+    Persists scraped videos on a single writer thread, in batched transactions.
+
+    Producers hand videos to submit() and carry on scraping. The writer commits once per
+    `batch_size` videos or `flush_seconds`, whichever comes first. The queue is bounded, so
+    when writes fall behind, submit() blocks and the scrapers slow down to match; the time
+    spent blocked is reported by metrics().
+    """
+
+    def __init__(self, queue_size=INGEST_QUEUE_SIZE, batch_size=INGEST_BATCH_SIZE, flush_seconds=INGEST_FLUSH_SECONDS):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._metrics = {
+            "submitted": 0,
+            "written": 0,
+            "failed": 0,
+            "batches": 0,
+            "write_seconds": 0.0,
+            "max_queue_depth": 0,
+            "blocked_submits": 0,
+            "blocked_seconds": 0.0,
+        }
+        self._thread = threading.Thread(target=self._run, name="ingest-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, video_data, schedule=None):
+        """
+        Queues a scraped video for writing, blocking while the queue is full.
+
+        Parameters:
+            video_data (dict): A dictionary containing video information and metrics.
+            schedule (tuple): (next_refresh, last_refresh, last_views) set by the refresh scheduler, or None.
+        """
+        record = video_record(video_data, schedule)
+        try:
+            self.queue.put_nowait(record)
+            blocked = None
+        except queue.Full:
+            start = time.monotonic()
+            self.queue.put(record)
+            blocked = time.monotonic() - start
+        with self._lock:
+            self._metrics["submitted"] += 1
+            self._metrics["max_queue_depth"] = max(self._metrics["max_queue_depth"], self.queue.qsize())
+            if blocked is not None:
+                self._metrics["blocked_submits"] += 1
+                self._metrics["blocked_seconds"] += blocked
+
+    def flush(self):
+        """
+        Blocks until every video submitted so far has been written.
+        """
+        self.queue.put(_FLUSH)
+        self.queue.join()
+
+    def close(self):
+        """
+        Writes what is still queued and stops the writer thread.
+        """
+        self.queue.put(_STOP)
+        self._thread.join()
+
+    def metrics(self):
+        """
+        Returns the writer's counters.
+
+        Returns:
+            dict: Videos submitted, written and failed, batches and seconds spent writing,
+            current and highest queue depth, and how often and how long submit() blocked.
+        """
+        with self._lock:
+            metrics = dict(self._metrics)
+        metrics["queue_depth"] = self.queue.qsize()
+        return metrics
+
+    def _write(self, batch):
+        """
+        Writes a batch in one transaction; if it fails, retries its videos one by one so a bad row loses only itself.
+        """
+        start = time.monotonic()
+        try:
+            write_video_batch(batch)
+            written, failed = len(batch), 0
+        except Exception:
+            logger.exception("Batch of %d videos failed, writing them one by one", len(batch))
+            written = failed = 0
+            for record in batch:
+                try:
+                    write_video_batch([record])
+                    written += 1
+                except Exception as e:
+                    logger.warning("Failed to write %s: %r", record["video"].get("video_url"), e)
+                    failed += 1
+        with self._lock:
+            self._metrics["written"] += written
+            self._metrics["failed"] += failed
+            self._metrics["batches"] += 1
+            self._metrics["write_seconds"] += time.monotonic() - start
+        for _ in batch:
+            self.queue.task_done()
+
+    def _run(self):
+        """
+        Drains the queue until stopped, committing a batch when it is full or `flush_seconds` old.
+        """
+        batch = []
+        deadline = None
+        try:
+            while True:
+                try:
+                    item = self.queue.get(timeout=None if deadline is None else max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    item = None
+
+                if item is _FLUSH or item is _STOP:
+                    if batch:
+                        self._write(batch)
+                        batch, deadline = [], None
+                    self.queue.task_done()
+                    if item is _STOP:
+                        return
+                    continue
+
+                if item is not None:
+                    batch.append(item)
+                    if deadline is None:
+                        deadline = time.monotonic() + self.flush_seconds
+                if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                    self._write(batch)
+                    batch, deadline = [], None
+        finally:
+            close_connections()
@@ -1,59 +1,114 @@
-from config import setup_browser
-from scraper import get_video_data, search_hashtag_videos, search_videos
-from process_data import process_video_data
-from sql_operations import create_db, fetch_video_data, fetch_video_url_list
+from config import SCRAPER_WORKERS, FETCH_MODE, DISCOVERY_INTERVAL_SECONDS, SNAPSHOT_ENABLED
+from crawl_frontier import CrawlFrontier
+from driver_pool import DriverPool
+from http_scraper import get_video_data_with_fallback
+from ingest_writer import BatchWriter
+from scraper import get_video_data
+from snapshot import SnapshotExporter
+from refresh_scheduler import PageBudget, refresh_due_videos
+from sql_operations import create_db
+from telemetry import record_cycle
+from trend_retention import compact_trends
+import logging
 import time
 
+logger = logging.getLogger(__name__)
+
 def main():
     """
     Main function to manage the video data scraping and database updates.
 
-    This function creates the database, enters a loop to periodically scrape 
-    video data, and update the database with new entries. It sleeps for 1 hour 
-    between iterations.
+    This function creates the database and then runs continuously: each video is
+    refreshed when its own schedule comes due, within a global pages-per-hour
+    budget, and the discovery frontier is expanded every DISCOVERY_INTERVAL_SECONDS.
+    Browsers are kept warm in a pool throughout, and scraped videos are saved by a
+    single batching writer thread. Stage timings and a summary of every cycle are
+    written to METRICS_PATH after each cycle, trend history past its retention window
+    is compacted, and the dashboard's Arrow snapshot is republished on a background
+    thread whenever a cycle wrote something.
     """
     create_db()
-    while True:
-        driver = setup_browser()
-        video_list = fetch_video_url_list() # Fetch current video URLs from the database
+    driver_pool = DriverPool(size=SCRAPER_WORKERS)
+    writer = BatchWriter()
+    budget = PageBudget()
+    frontier = CrawlFrontier()
+    exporter = SnapshotExporter() if SNAPSHOT_ENABLED else None
+    next_discovery = 0
+    try:
+        while True:
+            # Look for new videos
+            if time.monotonic() >= next_discovery:
+                next_discovery = time.monotonic() + DISCOVERY_INTERVAL_SECONDS
+                report = add_data_in_db(driver_pool, frontier, writer)
+                writer_metrics = writer.metrics()
+                logger.info("Writer metrics: %s", writer_metrics)
+                record_cycle("discovery", report, writer_metrics)
+
+            # Refresh the videos that are due, then wait for the next ones or for more budget
+            report, wait = update_data_in_db(driver_pool, budget, writer)
+            # An idle poll (nothing due, or the budget spent) is not a cycle
+            if report is not None:
+                record_cycle("refresh", report, writer.metrics())
 
-        # Update existing video data in the database
-        update_data_in_db(driver)
+            # Roll old trend history up once a day has passed; the writer is idle after its flush
+            compact_trends()
 
-        # If there are less than 41 videos, add new data
-        if len(video_list) < 41:
-            add_data_in_db(driver)
-        
-        driver.quit()
-        time.sleep(3600)
+            # Publish what the cycles wrote to the dashboard's snapshot; skipped when nothing changed
+            if exporter is not None:
+                exporter.request()
+            time.sleep(wait)
+    finally:
+        writer.close()
+        driver_pool.close()
+        if exporter is not None:
+            exporter.close()
 
-def update_data_in_db(driver):
+def update_data_in_db(driver_pool, budget, writer, workers=SCRAPER_WORKERS):
     """
-    Update video data in the database for existing videos.
+    Update video data in the database for the videos due a refresh.
+
+    The due videos are split between a pool of browser workers; each scraped
+    video is handed to the writer with its next refresh time as soon as its
+    result comes back, and every write is committed before returning.
+    With FETCH_MODE "http", pages are fetched without a browser and a worker only
+    borrows one from the pool for pages whose fields cannot be resolved.
 
     Parameters:
-        driver (webdriver.Chrome): The Selenium WebDriver instance to use for scraping.
+        driver_pool (DriverPool): The pool of warm browsers to scrape with.
+        budget (PageBudget): The global pages-per-hour budget.
+        writer (BatchWriter): The writer scraped videos are saved through.
+        workers (int): The number of workers to scrape with.
+
+    Returns:
+        tuple: The cycle report from scrape_in_parallel (None if nothing was due) and
+        the seconds to wait before the next call.
     """
-    video_list = fetch_video_url_list() # Fetch current video URLs from the database
-    for video_url in video_list:
-        video_info = get_video_data(driver, video_url) # Get updated video data
-        process_video_data(video_info) # Process and save the video data
+    result = refresh_due_videos(driver_pool, _scrape_function(), budget, save=writer.submit, workers=workers)
+    writer.flush()
+    return result
 
-def add_data_in_db(driver):
+def _scrape_function():
     """
-    Add new video data to the database based on search queries.
+    Returns the video scraping function selected by FETCH_MODE.
+    """
+    return get_video_data_with_fallback if FETCH_MODE == "http" else get_video_data
+
+def add_data_in_db(driver_pool, frontier, writer):
+    """
+    Add new videos to the database from the discovery frontier.
 
     Parameters:
-        driver (webdriver.Chrome): The Selenium WebDriver instance to use for scraping.
+        driver_pool (DriverPool): The pool of warm browsers to scrape with.
+        frontier (CrawlFrontier): The frontier of search terms and found videos.
+        writer (BatchWriter): The writer scraped videos are saved through.
+
+    Returns:
+        dict: The discovery report from CrawlFrontier.discover.
     """
-    search_list = ["biden", "trump", "us elections", "kamala"]
-    for query in search_list:
-        video_list = search_videos(driver, query) # Search for videos based on the query
-        for video_url in video_list[:5]:
-            video_in_db = fetch_video_data(video_url) # Check if the video is already in the database
-            if video_in_db == None: # Only add if it's not already there
-                video_info = get_video_data(driver, video_url)
-                process_video_data(video_info)
+    report = frontier.discover(driver_pool, _scrape_function(), save=writer.submit)
+    writer.flush()
+    return report
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
     main()
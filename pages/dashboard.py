@@ -1,116 +1,149 @@
 import streamlit as st
+from dashboard_data import VIDEO_SORTS, CHANNEL_SORTS, fetch_search_frame, fetch_video_page, fetch_channel_page, channel_summary, integrity_histogram, views_likes_by_integrity
 
-def video_table(query=""):
+def paged_table(name, query, sorts, fetch_page):
     """
-    Displays a summary table of videos filtered by the search query.
+    Displays the sort controls of a paginated table and fetches its current page.
+
+    The cursors of the pages visited so far are kept in st.session_state, so Previous and Next
+    only fetch the page being shown. Changing the search or the sort starts again from the first page.
 
     Parameters:
-        query (str): A string to filter video titles.
+        name (str): A unique name for the table's widgets and session state.
+        query (str): Search text matched against video titles and hashtags.
+        sorts (dict): The sort labels the table offers.
+        fetch_page (function): Fetches a page given the query, sort, direction and cursor.
+
+    Returns:
+        pandas.DataFrame: The rows of the current page.
+    """
+    sort_column, order_column = st.columns(2)
+    sort = sort_column.selectbox("Sort by", list(sorts), key=f"{name}_sort")
+    descending = order_column.selectbox("Order", ["Descending", "Ascending"], key=f"{name}_order") == "Descending"
+
+    cursors_key = f"{name}_cursors"
+    if st.session_state.get(f"{name}_view") != (query, sort, descending):
+        st.session_state[f"{name}_view"] = (query, sort, descending)
+        st.session_state[cursors_key] = [None]
+    cursors = st.session_state[cursors_key]
+    page, next_cursor = fetch_page(query, sort, descending, cursors[-1])
+
+    previous_column, page_column, next_column = st.columns([1, 4, 1])
+    previous_column.button("Previous", key=f"{name}_previous", disabled=len(cursors) == 1, on_click=cursors.pop)
+    page_column.caption(f"Page {len(cursors)}")
+    next_column.button("Next", key=f"{name}_next", disabled=next_cursor is None, on_click=cursors.append, args=(next_cursor,))
+    return page
+
+def video_table(query):
     """
-    conn = st.connection('bitchute_db', type='sql')
-    videos = conn.query(f'SELECT video_title AS Title, video_upload_date AS Upload_Date, video_info_integrity_score AS Integrity_Score, video_url AS Url, video_channel_url AS Channel_Url, video_views AS Views, video_likes AS Likes, video_dislikes AS Dislikes, video_comments_count AS Comments, video_channel_name AS Channel, CASE WHEN video_hashtags = "[]" THEN "None" ELSE video_hashtags END AS Hashtags FROM videos WHERE video_title LIKE "%{query}%"', ttl = 300)
-    event = st.dataframe(videos, on_select='rerun',selection_mode='single-row', column_config = {'Url': None, 'Channel_Url': None, 'Upload_Date': None})
+    Displays a paginated summary table of videos filtered by the search query.
+
+    Parameters:
+        query (str): Search text matched against video titles and hashtags.
+    """
+    videos = paged_table("video_table", query, VIDEO_SORTS, fetch_video_page)
+    event = st.dataframe(videos, on_select='rerun',selection_mode='single-row', column_config = {'Key': None, 'Url': None, 'Channel_Url': None, 'Upload_Date': None})
 
     if len(event.selection['rows']):
         selected_row = event.selection['rows'][0]
-        video_data = videos.iloc[selected_row].to_dict()
+        video_data = videos.iloc[selected_row].drop('Key').to_dict()
         st.session_state['video_data'] = video_data
         st.page_link('pages/video.py', label = 'More Details')
 
-def channel_table(query=""):
+def channel_table(query):
     """
-    Displays a summary table of channels associated with the videos filtered by the search query.
+    Displays a paginated summary table of channels associated with the videos filtered by the search query.
 
     Parameters:
-        query (str): A string to filter video titles.
+        query (str): Search text matched against video titles and hashtags.
     """
-    conn = st.connection('bitchute_db', type='sql')
-    channels = conn.query(f'SELECT video_channel_name AS Channel, AVG(video_info_integrity_score) AS Integrity_Score, SUM(video_views) AS Views, SUM(video_likes) AS Likes, SUM(video_dislikes) AS Dislikes, SUM(video_comments_count) AS Comments, video_channel_url AS Url FROM videos WHERE video_title LIKE "%{query}%" GROUP BY video_channel_name, video_channel_url', ttl = 300)
-    event = st.dataframe(channels, on_select='rerun',selection_mode='single-row',column_config = {'Url': st.column_config.LinkColumn(display_text="Open Channel Url")})
+    channels = paged_table("channel_table", query, CHANNEL_SORTS, fetch_channel_page)
+    event = st.dataframe(channels, on_select='rerun',selection_mode='single-row',column_config = {'Key': None, 'Url': st.column_config.LinkColumn(display_text="Open Channel Url")})
     
     if len(event.selection['rows']):
         selected_row = event.selection['rows'][0]
-        channel_data = channels.iloc[selected_row].to_dict()
+        channel_data = channels.iloc[selected_row].drop('Key').to_dict()
         st.session_state['channel_data'] = channel_data
         st.page_link('pages/channel.py', label = 'More Details')
 
-def video_data_vs_score(label, query=""):
+def video_data_vs_score(label, videos):
     """
     Generates a scatter chart comparing video metrics against the integrity score.
 
     Parameters:
         label (str): The metric to plot on the x-axis (e.g., "Views", "Likes").
-        query (str): A string to filter video titles.
+        videos (pandas.DataFrame): The videos matching the search.
     """
-    conn = st.connection('bitchute_db', type='sql')
-    data = conn.query(f'SELECT video_views AS Views, video_likes AS Likes, video_dislikes AS Dislikes, video_comments_count AS Comments, video_info_integrity_score AS Integrity_Score FROM videos WHERE video_title LIKE "%{query}%"', ttl = 300)
-    st.scatter_chart(data, x=label, y="Integrity_Score")
+    st.scatter_chart(videos[[label, "Integrity_Score"]], x=label, y="Integrity_Score")
 
-def videos_vs_integrity(query=""):
+def videos_vs_integrity(videos):
     """
     Displays a bar chart showing the count of videos in different integrity score ranges.
 
     Parameters:
-        query (str): A string to filter video titles.
+        videos (pandas.DataFrame): The videos matching the search.
     """
-    conn = st.connection('bitchute_db', type='sql')
-    data = conn.query(f'SELECT CASE WHEN video_info_integrity_score BETWEEN 1 AND 25 THEN "1-25" WHEN video_info_integrity_score BETWEEN 26 AND 50 THEN "26-50" WHEN video_info_integrity_score BETWEEN 51 AND 75 THEN "51-75" WHEN video_info_integrity_score BETWEEN 76 AND 100 THEN "76-100" END AS Integrity_Score, COUNT(*) AS Videos_Count FROM videos WHERE video_title LIKE "%{query}%" GROUP BY Integrity_Score ORDER BY Integrity_Score;', ttl = 300)
+    data = integrity_histogram(videos, "Videos_Count")
     st.bar_chart(data, x = "Integrity_Score", y="Videos_Count")
 
-def channels_vs_integrity(query=""):
+def channels_vs_integrity(channels):
     """
     Displays a bar chart showing the count of channels in different integrity score ranges.
 
     Parameters:
-        query (str): A string to filter video titles.
+        channels (pandas.DataFrame): Per-channel totals of the videos matching the search.
     """
-    conn = st.connection('bitchute_db', type='sql')
-    data = conn.query(f'SELECT Integrity_Score, COUNT(*) AS Channels_Count FROM (SELECT CASE WHEN Integrity_Score BETWEEN 1 AND 25 THEN "1-25" WHEN Integrity_Score BETWEEN 26 AND 50 THEN "26-50" WHEN Integrity_Score BETWEEN 51 AND 75 THEN "51-75" WHEN Integrity_Score BETWEEN 76 AND 100 THEN "76-100" END AS Integrity_Score, COUNT(*) AS Channels_Count FROM (SELECT video_channel_name AS Channel, AVG(video_info_integrity_score) AS Integrity_Score, SUM(video_views) AS Views, SUM(video_likes) AS Likes, SUM(video_dislikes) AS Dislikes, SUM(video_comments_count) AS Comments, video_channel_url AS Url FROM videos WHERE video_title LIKE "%{query}%" GROUP BY video_channel_name, video_channel_url) GROUP BY Integrity_Score ORDER BY Integrity_Score) GROUP BY Integrity_Score;', ttl = 300)
+    data = integrity_histogram(channels, "Channels_Count")
     st.bar_chart(data, x = "Integrity_Score", y="Channels_Count")
 
-def views_vs_likes_vs_integrity(query=""):
+def views_vs_likes_vs_integrity(videos):
     """
     Generates a scatter chart comparing total views against total likes, colored by integrity score.
 
     Parameters:
-        query (str): A string to filter video titles.
+        videos (pandas.DataFrame): The videos matching the search.
     """
-    conn = st.connection('bitchute_db', type='sql')
-    data = conn.query(f'SELECT CASE WHEN video_info_integrity_score BETWEEN 1 AND 25 THEN "1-25" WHEN video_info_integrity_score BETWEEN 26 AND 50 THEN "26-50" WHEN video_info_integrity_score BETWEEN 51 AND 75 THEN "51-75" WHEN video_info_integrity_score BETWEEN 76 AND 100 THEN "76-100" END AS Integrity_Score, SUM(video_views) AS Total_Views, SUM(video_likes) AS Total_Likes FROM videos WHERE video_title LIKE "%{query}%" GROUP BY Integrity_Score ORDER BY Integrity_Score;', ttl = 300)
+    data = views_likes_by_integrity(videos)
     st.scatter_chart(data, x = "Total_Likes", y="Total_Views", color = "Integrity_Score")
 
 def render_search(query=""):
     """
     Renders the main search interface, including video and channel summary tables and various visualizations.
 
+    The tables fetch one page at a time; the matching videos are fetched once for the charts, and the
+    channel totals and every chart are computed from them in memory.
+
     Parameters:
-        query (str): A string to filter video titles.
+        query (str): Search text matched against video titles and hashtags.
     """
     st.subheader("Video Data Summary Table")
     video_table(query)
     st.subheader("Channel Data Summary Table")
     channel_table(query)
+
+    videos = fetch_search_frame(query)
+    channels = channel_summary(videos)
     st.header("Data Visualizations")
     tab1, tab2, tab3, tab4 = st.tabs(["Views", "Likes", "Dislikes", "Comments"])
     with tab1:
         st.subheader("Views Over Integrity Score")
-        video_data_vs_score("Views", query)
+        video_data_vs_score("Views", videos)
     with tab2:
         st.subheader("Likes Over Integrity Score")
-        video_data_vs_score("Likes", query)
+        video_data_vs_score("Likes", videos)
     with tab3:
         st.subheader("Dislikes Over Integrity Score")
-        video_data_vs_score("Dislikes", query)
+        video_data_vs_score("Dislikes", videos)
     with tab4:
         st.subheader("Comments Over Integrity Score")
-        video_data_vs_score("Comments", query)
+        video_data_vs_score("Comments", videos)
     st.header("Additional Insights")
     st.subheader("Video Count - Integrity Score Histogram")
-    videos_vs_integrity(query)
+    videos_vs_integrity(videos)
     st.subheader("Channel Count - Integrity Score Histogram")
-    channels_vs_integrity(query)
+    channels_vs_integrity(channels)
     st.subheader("Views Over Likes Over Integrity Score")
-    views_vs_likes_vs_integrity(query)
+    views_vs_likes_vs_integrity(videos)
 
 def page_layout():
     """
@@ -121,6 +154,8 @@ def page_layout():
     st.sidebar.page_link("app.py", label="Home", icon=":material/home:", use_container_width=True)
     st.sidebar.write("Dashboard")
     st.sidebar.page_link("pages/dashboard.py", label="Dashboard", icon=":material/dashboard:", use_container_width=True)
+    st.sidebar.write("Operations")
+    st.sidebar.page_link("pages/ops.py", label="Operations", icon=":material/monitoring:", use_container_width=True)
     st.title("Bitchute Analytics Dashboard")
     st.subheader("Filter Videos")
     query = st.text_input("Search by Video Title:")
@@ -0,0 +1,47 @@
+import streamlit as st
+import datetime
+from config import METRICS_PATH
+from dashboard_data import scrape_metrics_frames
+from telemetry import read_metrics
+
+def page_layout():
+    """
+    Shows the scraper's telemetry: stage latencies, field failures and the latest cycles.
+
+    Everything is read from the metrics file the scraper rewrites after each cycle.
+    """
+    st.set_page_config(page_title="Scraper Operations", layout="wide")
+
+    st.sidebar.write("Home")
+    st.sidebar.page_link("app.py", label="Home", icon=":material/home:", use_container_width=True)
+    st.sidebar.write("Dashboard")
+    st.sidebar.page_link("pages/dashboard.py", label="Dashboard", icon=":material/dashboard:", use_container_width=True)
+    st.sidebar.write("Operations")
+    st.sidebar.page_link("pages/ops.py", label="Operations", icon=":material/monitoring:", use_container_width=True)
+
+    st.title("Scraper Operations")
+    samples, modified = read_metrics()
+    if modified is None:
+        st.write(f"No metrics yet: the scraper writes {METRICS_PATH} after its first cycle.")
+        return
+    st.caption(f"{METRICS_PATH}, updated {datetime.datetime.fromtimestamp(modified):%Y-%m-%d %H:%M:%S}")
+    frames = scrape_metrics_frames(samples)
+
+    st.header("Latest Cycles")
+    st.dataframe(frames["cycles"], hide_index=True, use_container_width=True)
+
+    st.header("Stage Latency")
+    st.dataframe(frames["stages"], hide_index=True, use_container_width=True)
+    st.bar_chart(frames["stages"], x="Stage", y="Total_s", x_label="Stage", y_label="Total seconds")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Fields Read")
+        st.dataframe(frames["fields"], hide_index=True, use_container_width=True)
+    with col2:
+        st.subheader("Element Wait Timeouts")
+        st.dataframe(frames["timeouts"], hide_index=True, use_container_width=True)
+        st.subheader("Ingest Writer")
+        st.dataframe(frames["writer"], hide_index=True, use_container_width=True)
+
+page_layout()
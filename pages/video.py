@@ -1,59 +1,22 @@
 import streamlit as st
-import sqlite3
-import pandas as pd
-import json
 import datetime
+from dashboard_data import fetch_video_trend, trend_frame
 
-def fetch_video_data(video_url):
+def video_trend(video_url, metric, start_date, end_date, label):
     """
-    Fetches video trend data from the SQLite database for the specified video URL.
+    Visualizes the trend data within a date range as a scatter chart.
 
-    Parameters:
-        video_url (str): The URL of the video.
-
-    Returns:
-        dict: A dictionary containing the video trend data or None if not found.
-    """
-    conn = sqlite3.connect('bitchute.db')  # Connect to your SQLite database
-    cursor = conn.cursor()
-    
-    query = """
-    SELECT video_comments_trend, 
-           video_views_trend, 
-           video_likes_trend, 
-           video_dislikes_trend
-    FROM videos
-    WHERE video_url = ?;
-    """
-    
-    cursor.execute(query, (video_url,))
-    row = cursor.fetchone()
-    
-    if row:
-        columns = [desc[0] for desc in cursor.description]
-        record_dict = dict(zip(columns, row))
-    else:
-        record_dict = None
-    
-    conn.close()
-    return record_dict
-
-def video_trend(trend_string, start_date, end_date, label):
-    """
-    Visualizes the trend data as a scatter chart.
+    Long ranges are downsampled to the chart's point budget before being sent to the browser.
 
     Parameters:
-        trend_string (str): JSON string containing trend data.
+        video_url (str): The URL of the video.
+        metric (str): The metric to plot (e.g., "views", "likes").
         start_date (datetime.date): The start date for filtering data.
         end_date (datetime.date): The end date for filtering data.
         label (str): The label for the y-axis.
     """
-    trend = json.loads(trend_string)
-    df = pd.DataFrame(trend)
-    df['t'] = pd.to_datetime(df['t'])
-    df = df.drop_duplicates(subset='t', keep='last')
-    filtered_df = df[(df['t'].dt.date >= start_date) & (df['t'].dt.date <= end_date)]
-    st.scatter_chart(filtered_df, x = "t", y = "c", x_label = "Time", y_label = label)
+    df = trend_frame(fetch_video_trend(video_url, metric, start_date, end_date), start_date, end_date)
+    st.scatter_chart(df, x = "t", y = "c", x_label = "Time", y_label = label)
 
 def page_layout():
     """
@@ -65,6 +28,8 @@ def page_layout():
     st.sidebar.page_link("app.py", label="Home", icon=":material/home:", use_container_width=True)
     st.sidebar.write("Dashboard")
     st.sidebar.page_link("pages/dashboard.py", label="Dashboard", icon=":material/dashboard:", use_container_width=True)
+    st.sidebar.write("Operations")
+    st.sidebar.page_link("pages/ops.py", label="Operations", icon=":material/monitoring:", use_container_width=True)
     
     st.title("Video Analytics Dashboard")
     st.header("Video Display")
@@ -94,16 +59,15 @@ def page_layout():
 
     st.header("Visualization")
     try:
-        video_data = fetch_video_data(st.session_state['video_data']['Url'])
         start_date, end_date = st.date_input('Select Date Range', value=(datetime.date.today() - datetime.timedelta(days=1) , datetime.date.today()))
         st.subheader("Views Over Time")
-        video_trend(video_data['video_views_trend'], start_date, end_date, "Views")
+        video_trend(video_url, "views", start_date, end_date, "Views")
         st.subheader("Likes Over Time")
-        video_trend(video_data['video_likes_trend'], start_date, end_date, "Likes")
+        video_trend(video_url, "likes", start_date, end_date, "Likes")
         st.subheader("Dislikes Over Time")
-        video_trend(video_data['video_dislikes_trend'], start_date, end_date, "Dislikes")
+        video_trend(video_url, "dislikes", start_date, end_date, "Dislikes")
         st.subheader("Comments Over Time")
-        video_trend(video_data['video_comments_trend'], start_date, end_date, "Comments")
+        video_trend(video_url, "comments", start_date, end_date, "Comments")
     except:
         st.write("Select a Date Range")
 
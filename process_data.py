@@ -1,54 +1,45 @@
 from datetime import datetime
 from utils import info_integrity_score
-import json
-from sql_operations import insert_video_data, update_video_data, fetch_video_data
+from sql_operations import to_hour, write_video_batch
+from telemetry import timed
 
-def process_video_data(video_data):
+def video_record(video_data, schedule=None):
     """
-    Process and store video data in the database.
+    Prepares everything stored for one scraped video, ready for write_video_batch.
 
     Parameters:
         video_data (dict): A dictionary containing video information and metrics.
-    """
-    # Initialize growth metrics
-    video_data['views_growth'] = {'t': datetime.utcnow().strftime('%Y-%m-%d %H:00:00'), 'c': video_data['video_views']}
-    video_data['likes_growth'] = {'t': datetime.utcnow().strftime('%Y-%m-%d %H:00:00'), 'c': video_data['video_likes']}
-    video_data['dislikes_growth'] = {'t': datetime.utcnow().strftime('%Y-%m-%d %H:00:00'), 'c': video_data['video_dislikes']}
-    video_data['comments_growth'] = {'t': datetime.utcnow().strftime('%Y-%m-%d %H:00:00'), 'c': video_data['video_comments_count']}
-
-    # Check if the video already exists in the database
-    video_data_in_db = fetch_video_data(video_data['video_url'])
-    
-    if video_data_in_db == None:
-        # If video is new, initialize trend lists
-        video_data['video_views_trend'] = [video_data['views_growth']]
-        video_data['video_likes_trend'] = [video_data['likes_growth']]
-        video_data['video_dislikes_trend'] = [video_data['dislikes_growth']]
-        video_data['video_comments_trend'] = [video_data['comments_growth']]
+        schedule (tuple): (next_refresh, last_refresh, last_views) set by the refresh scheduler, or None.
 
-        # Calculate the integrity score for the new video
-        video_data['video_info_integrity_score'] = info_integrity_score()
-
-        # Insert the new video data into the database
-        insert_video_data(video_data)
-    else:
-        # If video already exists, update the trend data
-        video_views_trend = json.loads(video_data_in_db['video_views_trend'])
-        video_likes_trend = json.loads(video_data_in_db['video_likes_trend'])
-        video_dislikes_trend = json.loads(video_data_in_db['video_dislikes_trend'])
-        video_comments_trend = json.loads(video_data_in_db['video_comments_trend'])
-
-        # Append the new growth metrics to the existing trends
-        video_views_trend.append(video_data['views_growth'])
-        video_likes_trend.append(video_data['likes_growth'])
-        video_dislikes_trend.append(video_data['dislikes_growth'])
-        video_comments_trend.append(video_data['comments_growth'])
+    Returns:
+        dict: The video data, its hourly trend samples and the schedule.
+    """
+    # The integrity score is only stored when the video is new
+    video_data.setdefault('video_info_integrity_score', info_integrity_score())
+    return {
+        'video': video_data,
+        # Current hourly sample for each trend metric
+        'sample_time': to_hour(datetime.utcnow()),
+        'samples': {
+            'views': video_data['video_views'],
+            'likes': video_data['video_likes'],
+            'dislikes': video_data['video_dislikes'],
+            'comments': video_data['video_comments_count'],
+        },
+        'schedule': schedule,
+    }
+
+@timed
+def process_video_data(video_data, schedule=None):
+    """
+    Process and store video data in the database.
 
-        # Update video data trends
-        video_data['video_views_trend'] = video_views_trend
-        video_data['video_likes_trend'] = video_likes_trend
-        video_data['video_dislikes_trend'] = video_dislikes_trend
-        video_data['video_comments_trend'] = video_comments_trend
+    New videos are inserted and known ones updated, and the samples are appended;
+    existing history is never read or rewritten. The scraper's main loop batches
+    these writes through ingest_writer.BatchWriter instead.
 
-        # Update the existing video data in the database
-        update_video_data(video_data)
\ No newline at end of file
+    Parameters:
+        video_data (dict): A dictionary containing video information and metrics.
+        schedule (tuple): (next_refresh, last_refresh, last_views) set by the refresh scheduler, or None.
+    """
+    write_video_batch([video_record(video_data, schedule)])
\ No newline at end of file
@@ -0,0 +1,93 @@
+import threading
+from collections import OrderedDict
+import pandas as pd
+from db import get_read_connection
+from sql_operations import fetch_write_generation
+
+# Memory budget for cached results; least recently used results are evicted beyond it
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+class QueryCache:
+    """
+    Process-wide cache of query results, shared by every dashboard session.
+
+    Entries are keyed on the SQL text and its bound parameters, and are only valid for
+    the write generation they were computed at: once sql_operations commits a write,
+    the next lookup recomputes. Cached frames are shared and must not be modified.
+    """
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def query(self, sql, params=None):
+        """
+        Returns the result of a parameterized query, from the cache when the database is unchanged.
+
+        Parameters:
+            sql (str): The query, with ':name' placeholders.
+            params (dict): The values bound to the placeholders.
+
+        Returns:
+            pandas.DataFrame: The query result.
+        """
+        key = (sql, tuple(sorted((params or {}).items())))
+        generation = fetch_write_generation()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == generation:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        frame = pd.read_sql_query(sql, get_read_connection(), params=params or None)
+        size = int(frame.memory_usage(deep=True).sum())
+
+        with self._lock:
+            self._remove(key)
+            if size <= self.max_bytes:
+                self._entries[key] = (generation, frame, size)
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    self._remove(next(iter(self._entries)))
+        return frame
+
+    def _remove(self, key):
+        """
+        Drops an entry if present. Must be called with the lock held.
+
+        Parameters:
+            key (tuple): The cache key.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def clear(self):
+        """
+        Drops every cached result.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+_cache = QueryCache()
+
+def cached_query(sql, params=None):
+    """
+    Runs a parameterized query through the shared write-aware cache.
+
+    Parameters:
+        sql (str): The query, with ':name' placeholders.
+        params (dict): The values bound to the placeholders.
+
+    Returns:
+        pandas.DataFrame: The query result; shared with other callers, so it must not be modified.
+    """
+    return _cache.query(sql, params)
\ No newline at end of file
@@ -0,0 +1,144 @@
+import time
+from datetime import datetime, timedelta
+from config import (SCRAPER_WORKERS, REFRESH_PAGES_PER_HOUR, REFRESH_BATCH_SIZE, REFRESH_MIN_HOURS,
+                    REFRESH_MAX_HOURS, REFRESH_VELOCITY_VIEWS, REFRESH_IDLE_SECONDS)
+from process_data import process_video_data
+from scrape_pool import scrape_in_parallel
+from sql_operations import fetch_due_refreshes, fetch_next_refresh_time, schedule_refresh
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+def refresh_interval(age_hours, views_per_hour=None):
+    """
+    Decides how long to wait before refreshing a video again.
+
+    A video is refreshed about once per day of its age, so new uploads are checked hourly and
+    old ones weekly, and the wait shrinks further while its view count is growing.
+
+    Parameters:
+        age_hours (float): Hours since the video was uploaded, or None if unknown.
+        views_per_hour (float): Views gained per hour since the previous refresh, or None if unknown.
+
+    Returns:
+        float: The interval in hours, between REFRESH_MIN_HOURS and REFRESH_MAX_HOURS.
+    """
+    hours = REFRESH_MAX_HOURS if age_hours is None else age_hours / 24
+    if views_per_hour and views_per_hour > 0:
+        hours /= 1 + views_per_hour / REFRESH_VELOCITY_VIEWS
+    return min(max(hours, REFRESH_MIN_HOURS), REFRESH_MAX_HOURS)
+
+def _parse_time(value):
+    """
+    Parses a stored 'YYYY-MM-DD HH:MM:SS' time, returning None for missing or malformed values.
+    """
+    try:
+        return datetime.strptime(value, TIME_FORMAT)
+    except (TypeError, ValueError):
+        return None
+
+def next_refresh(entry, video_views, now):
+    """
+    Computes a video's next refresh from the refresh just made.
+
+    Parameters:
+        entry (dict): The video's row from fetch_due_refreshes.
+        video_views (int): The view count the refresh found.
+        now (datetime.datetime): The time of the refresh, in UTC.
+
+    Returns:
+        datetime.datetime: The UTC time of the next refresh.
+    """
+    uploaded = _parse_time(entry['video_upload_date'])
+    age_hours = (now - uploaded).total_seconds() / 3600 if uploaded else None
+
+    views_per_hour = None
+    last_refresh = _parse_time(entry['last_refresh'])
+    if last_refresh and entry['last_views'] is not None and video_views is not None:
+        elapsed_hours = (now - last_refresh).total_seconds() / 3600
+        if elapsed_hours > 0:
+            views_per_hour = (video_views - entry['last_views']) / elapsed_hours
+
+    return now + timedelta(hours=refresh_interval(age_hours, views_per_hour))
+
+class PageBudget:
+    """
+    Token bucket limiting the scheduler to `pages_per_hour` page fetches.
+
+    Budget left unused accumulates up to `burst` pages, which is also the largest batch handed out at once.
+    """
+
+    def __init__(self, pages_per_hour=REFRESH_PAGES_PER_HOUR, burst=REFRESH_BATCH_SIZE):
+        self.rate = pages_per_hour / 3600
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self):
+        """
+        Returns the number of whole pages that may be fetched now.
+        """
+        self._refill()
+        return int(self.tokens)
+
+    def spend(self, pages):
+        """
+        Takes `pages` pages out of the budget.
+        """
+        self._refill()
+        self.tokens -= pages
+
+    def seconds_until(self, pages=1):
+        """
+        Returns how long until `pages` pages are available.
+        """
+        self._refill()
+        return max(0.0, (pages - self.tokens) / self.rate)
+
+def refresh_due_videos(driver_pool, scrape, budget, save=process_video_data, workers=SCRAPER_WORKERS):
+    """
+    Refreshes the most overdue videos the page budget allows, then reschedules each of them.
+
+    Parameters:
+        driver_pool (DriverPool): The pool of warm browsers to scrape with.
+        scrape (callable): The scraping function, called as scrape(driver, url).
+        budget (PageBudget): The global page budget.
+        save (callable): Stores a scraped video, called as save(video_data, schedule); e.g. BatchWriter.submit.
+            Its writes must be committed before the next call, or the same videos are still due.
+        workers (int): The number of workers to scrape with.
+
+    Returns:
+        tuple: The scrape_in_parallel report (None if nothing was scraped) and the number of
+        seconds to wait before calling again.
+    """
+    pages = budget.available()
+    if pages < 1:
+        return None, budget.seconds_until(1)
+
+    now = datetime.utcnow().replace(microsecond=0)
+    due = fetch_due_refreshes(now.strftime(TIME_FORMAT), pages)
+    if not due:
+        upcoming = _parse_time(fetch_next_refresh_time())
+        wait = (upcoming - now).total_seconds() if upcoming else REFRESH_IDLE_SECONDS
+        return None, min(max(wait, 1), REFRESH_IDLE_SECONDS)
+
+    budget.spend(len(due))
+    entries = {entry['video_url']: entry for entry in due}
+
+    def handle_result(video_data):
+        entry = entries[video_data['video_url']]
+        refreshed = datetime.utcnow().replace(microsecond=0)
+        save(video_data, (next_refresh(entry, video_data['video_views'], refreshed).strftime(TIME_FORMAT),
+                          refreshed.strftime(TIME_FORMAT), video_data['video_views']))
+
+    report = scrape_in_parallel(list(entries), scrape, handle_result, driver_pool, workers=workers)
+
+    # Failed pages are retried after the shortest interval rather than straight away
+    retry = (datetime.utcnow() + timedelta(hours=REFRESH_MIN_HOURS)).strftime(TIME_FORMAT)
+    for url in report['failures']:
+        schedule_refresh(entries[url]['video_id'], retry)
+    return report, 0
@@ -0,0 +1,99 @@
+import logging
+import queue
+import threading
+import time
+from config import SCRAPER_WORKERS, CYCLE_BUDGET_SECONDS
+
+logger = logging.getLogger(__name__)
+
+def _scrape_worker(url_queue, result_queue, scrape, driver_pool):
+    """
+    Pulls URLs off the shared queue and scrapes them with pooled browsers until the queue is empty.
+
+    Parameters:
+        url_queue (queue.Queue): The URLs still waiting to be scraped.
+        result_queue (queue.Queue): Receives a (url, data, error) tuple for every scraped URL.
+        scrape (callable): The scraping function, called as scrape(driver, url).
+        driver_pool (DriverPool): The pool browsers are borrowed from, only when a page needs one.
+    """
+    while True:
+        try:
+            url = url_queue.get_nowait()
+        except queue.Empty:
+            return
+        try:
+            result_queue.put((url, driver_pool.run(scrape, url), None))
+        except Exception as e:
+            result_queue.put((url, None, e))
+
+def scrape_in_parallel(urls, scrape, handle_result, driver_pool, workers=SCRAPER_WORKERS):
+    """
+    Scrapes a list of URLs with a pool of browser workers.
+
+    Results are handed to handle_result on the calling thread as they arrive, so
+    database writes stay on a single thread. Workers wait while results are
+    queued faster than handle_result takes them.
+
+    Parameters:
+        urls (list): The URLs to scrape.
+        scrape (callable): The scraping function, called as scrape(driver, url).
+        handle_result (callable): Called with the data returned for each successfully scraped URL.
+        driver_pool (DriverPool): The pool of warm browsers the workers share.
+        workers (int): The number of workers to start.
+
+    Returns:
+        dict: A cycle report with the page count, successes, per-URL failures, duration and budget.
+    """
+    start = time.monotonic()
+    url_queue = queue.Queue()
+    for url in urls:
+        url_queue.put(url)
+
+    workers = max(1, min(workers, len(urls)))
+    # Bounded, so workers pause instead of piling up results when handle_result falls behind
+    result_queue = queue.Queue(maxsize=2 * workers)
+    threads = [threading.Thread(target=_scrape_worker, args=(url_queue, result_queue, scrape, driver_pool), daemon=True)
+               for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    succeeded = 0
+    failures = {}
+    pending = len(urls)
+    while pending:
+        try:
+            url, data, error = result_queue.get(timeout=1)
+        except queue.Empty:
+            # Every worker has exited and nothing is left to collect
+            if not any(thread.is_alive() for thread in threads) and result_queue.empty():
+                break
+            continue
+
+        pending -= 1
+        if error is not None:
+            failures[url] = repr(error)
+            continue
+        try:
+            handle_result(data)
+            succeeded += 1
+        except Exception as e:
+            failures[url] = repr(e)
+
+    # URLs no worker got to
+    while not url_queue.empty():
+        failures[url_queue.get_nowait()] = "not scraped: no worker available"
+
+    report = {
+        "pages": len(urls),
+        "succeeded": succeeded,
+        "failures": failures,
+        "workers": len(threads),
+        "duration": time.monotonic() - start,
+        "budget": CYCLE_BUDGET_SECONDS,
+    }
+    log = logger.warning if report["duration"] > report["budget"] else logger.info
+    log("Scraped %d/%d pages with %d workers in %.0fs (budget %ds), %d failed",
+        succeeded, len(urls), report["workers"], report["duration"], report["budget"], len(failures))
+    for url, error in failures.items():
+        logger.warning("Failed to scrape %s: %s", url, error)
+    return report
\ No newline at end of file
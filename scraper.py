@@ -1,27 +1,208 @@
 from selenium.webdriver import ActionChains
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+import logging
 import time
-from utils import convert_to_datetime, extract_views
+from config import PAGE_READY_TIMEOUT, ELEMENT_TIMEOUT, REPORT_PAGE_BYTES, EXTRACTION_MODE
+from telemetry import count, observe, record_fields, stage, timed
+from utils import convert_to_datetime, convert_iso_to_datetime, extract_views
 import urllib.parse
 
-def search_videos(driver, query):
+logger = logging.getLogger(__name__)
+
+VIDEO_CARD_LINK_XPATH = '//*[@id="video-card"]/div[2]/div/div[2]/a[1]'
+UPLOAD_DATE_XPATH = '//*[@id="q-app"]/div/div[1]/div/div[2]/div/div[2]/div[1]/div[2]/div[1]/div[1]/div[2]/div/span'
+UPLOAD_TOOLTIP_XPATH = '//*[@id="q-portal--tooltip--1"]/div'
+HASHTAGS_XPATH = '//*[@id="q-app"]/div/div[1]/div/div[2]/div/div[2]/div[1]/div[2]/div[1]/div[2]'
+TITLE_XPATH = '//*[@id="q-app"]/div/div[1]/div/div[2]/div/div[2]/div[1]/div[2]/div[1]/div[1]/div[1]/div'
+VIEWS_XPATH = '//*[@id="q-app"]/div/div[1]/div/div[2]/div/div[2]/div[1]/div[2]/div[1]/div[1]/div[2]/div'
+LIKES_XPATH = '//*[@id="responsive_menu"]/div[1]/button[1]/span[2]/span'
+DISLIKES_XPATH = '//*[@id="responsive_menu"]/div[1]/button[2]/span[2]/span'
+CHANNEL_LINK_XPATH = '//*[@id="q-app"]/div/div[1]/div/div[2]/div/div[2]/div[1]/div[2]/div[1]/div[3]/div[1]/div/div[2]/a'
+CHANNEL_NAME_XPATH = '//*[@id="q-app"]/div/div[1]/div/div[2]/div/div[2]/div[1]/div[2]/div[1]/div[3]/div[1]/div/div[2]/a/div'
+COMMENT_COUNT_XPATH = '//*[@id="comments-container"]/ul/div[1]/li[1]/span[1]'
+
+# Elements get_video_data reads, with the seconds to wait for each after navigation.
+# Views is the last counter the page fills in, so it has to carry text before we read it.
+# In script mode the extraction script checks them all at once, for PAGE_READY_TIMEOUT in all.
+VIDEO_PAGE_ELEMENTS = [
+    (TITLE_XPATH, PAGE_READY_TIMEOUT, True),
+    (VIEWS_XPATH, PAGE_READY_TIMEOUT, True),
+    (UPLOAD_DATE_XPATH, PAGE_READY_TIMEOUT, False),
+    (LIKES_XPATH, PAGE_READY_TIMEOUT, False),
+    (DISLIKES_XPATH, PAGE_READY_TIMEOUT, False),
+    (CHANNEL_LINK_XPATH, PAGE_READY_TIMEOUT, False),
+    (HASHTAGS_XPATH, ELEMENT_TIMEOUT, False),
+    (COMMENT_COUNT_XPATH, PAGE_READY_TIMEOUT, False),
+]
+
+# Where each field of a video page is read from, by page layout version. When BitChute changes its
+# markup, add a version rather than editing one in place, and point SELECTOR_VERSION at it.
+# Fields are (xpath, property): "text" is the rendered text, anything else a DOM property such as
+# "href". Hashtags are (container xpath, anchor xpath, label xpath), the last two relative.
+VIDEO_PAGE_SELECTORS = {
+    1: {
+        "fields": {
+            "video_title": (TITLE_XPATH, "text"),
+            "views": (VIEWS_XPATH, "text"),
+            "likes": (LIKES_XPATH, "text"),
+            "dislikes": (DISLIKES_XPATH, "text"),
+            "channel_url": (CHANNEL_LINK_XPATH, "href"),
+            "channel_name": (CHANNEL_NAME_XPATH, "text"),
+            "comment_count": (COMMENT_COUNT_XPATH, "text"),
+        },
+        "hashtags": (HASHTAGS_XPATH, './/a', './div/div[2]'),
+    },
+}
+SELECTOR_VERSION = 1
+
+# Reads every field of a video page in one call. The exact upload date comes from the page's
+# schema.org JSON-LD (or an itemprop meta tag), which is present without opening the tooltip.
+# Until every [xpath, require_text] element in `waits` is ready, it returns only {waiting: [xpaths]}.
+EXTRACT_VIDEO_SCRIPT = """
+const [fields, hashtags, waits] = arguments;
+const first = (xpath, context) => document.evaluate(xpath, context || document, null,
+    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+const all = (xpath, context) => {
+    const nodes = document.evaluate(xpath, context, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    return Array.from({length: nodes.snapshotLength}, (_, i) => nodes.snapshotItem(i));
+};
+const waiting = waits.filter(([xpath, requireText]) => {
+    const node = first(xpath);
+    return node === null || (requireText && !node.innerText.trim());
+}).map(([xpath]) => xpath);
+if (waiting.length) {
+    return {waiting};
+}
+const result = {};
+for (const [name, [xpath, property]] of Object.entries(fields)) {
+    const node = first(xpath);
+    result[name] = node === null ? null : property === 'text' ? node.innerText.trim() : node[property];
+}
+const container = first(hashtags[0]);
+result.hashtags = container === null ? null : all(hashtags[1], container).map(anchor => {
+    const label = first(hashtags[2], anchor);
+    return label === null ? '' : label.innerText.trim();
+});
+result.upload_date = null;
+for (const script of document.querySelectorAll('script[type="application/ld+json"]')) {
+    try {
+        const data = JSON.parse(script.textContent);
+        const objects = [].concat(data, data['@graph'] || []);
+        const video = objects.find(object => object && object.uploadDate);
+        if (video) { result.upload_date = video.uploadDate; break; }
+    } catch (e) {}
+}
+if (result.upload_date === null) {
+    const meta = document.querySelector('meta[itemprop="uploadDate"]');
+    result.upload_date = meta === null ? null : meta.content;
+}
+return result;
+"""
+
+# Sums the over-the-wire size of the document and every resource it has loaded so far.
+# Cross-origin resources without Timing-Allow-Origin report 0, so this is a lower bound.
+PAGE_BYTES_SCRIPT = """
+return performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'))
+    .reduce((total, entry) => total + (entry.transferSize || 0), 0);
+"""
+
+def _element_with_text(locator):
     """
-    Searches for videos on Bitchute using a specified query.
+    Expected condition that an element is present and has non-empty text.
+
+    Parameters:
+        locator (tuple): A (By, selector) locator.
+
+    Returns:
+        callable: A condition returning the element once it has text, otherwise False.
+    """
+    def condition(driver):
+        elements = driver.find_elements(*locator)
+        if elements and elements[0].text.strip():
+            return elements[0]
+        return False
+    return condition
+
+def wait_for_element(driver, xpath, timeout=ELEMENT_TIMEOUT, require_text=False):
+    """
+    Waits until an element is present in the page, instead of sleeping for a fixed time.
 
     Parameters:
         driver (webdriver): The Selenium WebDriver instance.
-        query (str): The search term to query Bitchute.
+        xpath (str): The XPath of the element to wait for.
+        timeout (float): The maximum number of seconds to wait.
+        require_text (bool): Whether to also wait for the element to have non-empty text.
 
     Returns:
-        list: A list of video URLs matching the search query.
+        WebElement: The element, as soon as it is ready.
+
+    Raises:
+        TimeoutException: If the element is not ready within the timeout.
     """
-    search = urllib.parse.quote(query)
-    url = f"https://www.bitchute.com/search?query={search}&kind=video&sensitivity_id=normal&duration=all&sort=new"
-    driver.get(url)
-    time.sleep(10)
-    
+    locator = (By.XPATH, xpath)
+    condition = _element_with_text(locator) if require_text else EC.presence_of_element_located(locator)
+    return WebDriverWait(driver, timeout).until(condition, message=f"Timed out after {timeout}s waiting for {xpath}")
+
+def load_page(driver, url, elements, ready=None):
+    """
+    Opens a page and waits until every element the extractor needs is ready.
+
+    Parameters:
+        driver (webdriver): The Selenium WebDriver instance.
+        url (str): The URL to open.
+        elements (list): (xpath, timeout, require_text) tuples to wait for, one wait each.
+        ready (callable): Called with the driver after the element waits, to wait for and read the
+            page itself in fewer calls (see extract_video_fields).
+
+    Returns:
+        The result of `ready`, or None without one.
+    """
+    start = time.monotonic()
+    with stage("scraper.driver_get"):
+        driver.get(url)
+    for xpath, timeout, require_text in elements:
+        try:
+            with stage("scraper.wait_for_element"):
+                wait_for_element(driver, xpath, timeout, require_text)
+        except TimeoutException:
+            count("scrape_wait_timeouts_total", xpath=xpath)
+            raise
+    result = ready(driver) if ready is not None else None
+    elapsed = time.monotonic() - start
+
+    # From navigation until the page is ready to read, waits included
+    observe("scraper.page_ready", elapsed)
+    if REPORT_PAGE_BYTES:
+        transferred = driver.execute_script(PAGE_BYTES_SCRIPT)
+        count("scrape_page_bytes_total", transferred, stage="scraper.driver_get")
+        count("scrape_pages_measured_total", stage="scraper.driver_get")
+        logger.debug("%s ready in %.2fs, %d bytes transferred", url, elapsed, transferred)
+    else:
+        logger.debug("%s ready in %.2fs", url, elapsed)
+    return result
+
+def _collect_video_links(driver, url):
+    """
+    Opens a listing page and collects the video links on it.
+
+    Parameters:
+        driver (webdriver): The Selenium WebDriver instance.
+        url (str): The URL of the search or hashtag page.
+
+    Returns:
+        list: A list of video URLs, empty if no video card appears within the timeout.
+    """
+    try:
+        load_page(driver, url, [(VIDEO_CARD_LINK_XPATH, PAGE_READY_TIMEOUT, False)])
+    except TimeoutException:
+        logger.info("No video cards found on %s", url)
+        return []
+
     videos_link_list = []
-    videos_links = driver.find_elements(By.XPATH, '//*[@id="video-card"]/div[2]/div/div[2]/a[1]')
+    videos_links = driver.find_elements(By.XPATH, VIDEO_CARD_LINK_XPATH)
     
     for video in videos_links:
         link = video.get_attribute("href")
@@ -29,41 +210,31 @@ def search_videos(driver, query):
     
     return videos_link_list
 
-def get_video_data(driver, video_url):
+@timed
+def search_videos(driver, query):
     """
-    Retrieves video data from a given video URL.
+    Searches for videos on Bitchute using a specified query.
 
     Parameters:
         driver (webdriver): The Selenium WebDriver instance.
-        video_url (str): The URL of the video to scrape data from.
+        query (str): The search term to query Bitchute.
 
     Returns:
-        dict: A dictionary containing the video data.
+        list: A list of video URLs matching the search query.
+    """
+    search = urllib.parse.quote(query)
+    url = f"https://www.bitchute.com/search?query={search}&kind=video&sensitivity_id=normal&duration=all&sort=new"
+    return _collect_video_links(driver, url)
+
+def _video_data(video_url, title, views, likes, dislikes, channel_url, channel_name, comment_count, upload_date, hashtags):
     """
-    driver.get(video_url)
-    time.sleep(10)
+    Converts the text read from a video page into the video data dictionary.
 
-    upload_exact = driver.find_element(By.XPATH, '//*[@id="q-app"]/div/div[1]/div/div[2]/div/div[2]/div[1]/div[2]/div[1]/div[1]/div[2]/div/span')
-    actions = ActionChains(driver)
-    actions.move_to_element(upload_exact).perform()
-    upload_exact.click()
-    time.sleep(3)
-
-    parent_hashtag_element = driver.find_element(By.XPATH, '//*[@id="q-app"]/div/div[1]/div/div[2]/div/div[2]/div[1]/div[2]/div[1]/div[2]')
-    anchor_tags = parent_hashtag_element.find_elements(By.XPATH, './/a')
-    hashtags = [anchor.find_element(By.XPATH, './div/div[2]').text for anchor in anchor_tags]
-
-    video_title = driver.find_element(By.XPATH, '//*[@id="q-app"]/div/div[1]/div/div[2]/div/div[2]/div[1]/div[2]/div[1]/div[1]/div[1]/div').text
-    views = driver.find_element(By.XPATH, '//*[@id="q-app"]/div/div[1]/div/div[2]/div/div[2]/div[1]/div[2]/div[1]/div[1]/div[2]/div').text
-    likes = driver.find_element(By.XPATH, '//*[@id="responsive_menu"]/div[1]/button[1]/span[2]/span').text
-    dislikes = driver.find_element(By.XPATH, '//*[@id="responsive_menu"]/div[1]/button[2]/span[2]/span').text
-    channel_url = driver.find_element(By.XPATH, '//*[@id="q-app"]/div/div[1]/div/div[2]/div/div[2]/div[1]/div[2]/div[1]/div[3]/div[1]/div/div[2]/a').get_attribute("href")
-    channel_name = driver.find_element(By.XPATH, '//*[@id="q-app"]/div/div[1]/div/div[2]/div/div[2]/div[1]/div[2]/div[1]/div[3]/div[1]/div/div[2]/a/div').text
-    upload_date = driver.find_element(By.XPATH, '//*[@id="q-portal--tooltip--1"]/div').text
-    comment_count = driver.find_element(By.XPATH, '//*[@id="comments-container"]/ul/div[1]/li[1]/span[1]').text
-
-    video_data = {
-        "video_title": video_title,
+    Returns:
+        dict: A dictionary containing the video data.
+    """
+    return {
+        "video_title": title,
         "video_url": video_url,
         "video_views": extract_views(views),
         "video_likes": int(likes) if likes != '' else 0,
@@ -71,12 +242,141 @@ def get_video_data(driver, video_url):
         "video_channel_url": channel_url,
         "video_channel_name": channel_name,
         "video_comments_count": int(comment_count) if comment_count != '' else 0,
-        "video_upload_date": convert_to_datetime(upload_date),
+        "video_upload_date": upload_date,
         "video_hashtags": hashtags
     }
-    
-    return video_data
 
+@timed
+def _upload_date_from_tooltip(driver):
+    """
+    Reads the exact upload date by hovering over and clicking the relative date to open its tooltip.
+
+    Parameters:
+        driver (webdriver): The Selenium WebDriver instance, on a loaded video page.
+
+    Returns:
+        str: The upload date in 'YYYY-MM-DD HH:MM:SS' format.
+    """
+    upload_exact = driver.find_element(By.XPATH, UPLOAD_DATE_XPATH)
+    actions = ActionChains(driver)
+    actions.move_to_element(upload_exact).perform()
+    upload_exact.click()
+    return convert_to_datetime(wait_for_element(driver, UPLOAD_TOOLTIP_XPATH, ELEMENT_TIMEOUT, require_text=True).text)
+
+def _find_field(driver, field, xpath):
+    """
+    Finds the element of one video page field, counting whether it was there.
+
+    Parameters:
+        driver (webdriver): The Selenium WebDriver instance, on a loaded video page.
+        field (str): The field's name in VIDEO_PAGE_SELECTORS.
+        xpath (str): The XPath of its element.
+
+    Returns:
+        WebElement: The element.
+
+    Raises:
+        NoSuchElementException: If the element is missing from the page.
+    """
+    try:
+        element = driver.find_element(By.XPATH, xpath)
+    except NoSuchElementException:
+        record_fields([], [field])
+        raise
+    record_fields([field], [])
+    return element
+
+@timed
+def extract_video_fields(driver, version=SELECTOR_VERSION):
+    """
+    Waits for a video page to be ready and reads every field of it, with one script call per poll.
+
+    The script itself checks the elements of VIDEO_PAGE_ELEMENTS, so a page that is already
+    ready is read in a single call.
+
+    Parameters:
+        driver (webdriver): The Selenium WebDriver instance, on a video page.
+        version (int): The VIDEO_PAGE_SELECTORS version to read with.
+
+    Returns:
+        dict: The raw text of each field, the hashtag labels and the ISO upload date (None if the page has none).
+
+    Raises:
+        TimeoutException: If the page is not ready within PAGE_READY_TIMEOUT.
+        NoSuchElementException: If a field's element is missing from the page.
+    """
+    selectors = VIDEO_PAGE_SELECTORS[version]
+    waits = [[xpath, require_text] for xpath, _, require_text in VIDEO_PAGE_ELEMENTS]
+    waiting = []
+
+    def extracted(driver):
+        result = driver.execute_script(EXTRACT_VIDEO_SCRIPT, selectors["fields"], selectors["hashtags"], waits)
+        waiting[:] = result.get("waiting", [])
+        return False if waiting else result
+
+    try:
+        fields = WebDriverWait(driver, PAGE_READY_TIMEOUT).until(
+            extracted, message=f"Timed out after {PAGE_READY_TIMEOUT}s waiting for the video page")
+    except TimeoutException:
+        for xpath in waiting:
+            count("scrape_wait_timeouts_total", xpath=xpath)
+        raise
+    missing = [name for name in selectors["fields"] if fields.get(name) is None]
+    if fields.get("hashtags") is None:
+        missing.append("hashtags")
+    record_fields([name for name in [*selectors["fields"], "hashtags"] if name not in missing], missing)
+    if missing:
+        raise NoSuchElementException(f"{', '.join(missing)} not found with selector version {version}")
+    return fields
+
+@timed
+def get_video_data(driver, video_url):
+    """
+    Retrieves video data from a given video URL.
+
+    With EXTRACTION_MODE "script" the page is waited for and its fields read in one script
+    call, and the upload date comes from the page's structured data; the tooltip is only
+    opened if that is missing. "elements" waits for and reads each field with its own
+    WebDriver call.
+
+    Parameters:
+        driver (webdriver): The Selenium WebDriver instance.
+        video_url (str): The URL of the video to scrape data from.
+
+    Returns:
+        dict: A dictionary containing the video data.
+    """
+    if EXTRACTION_MODE == "script":
+        fields = load_page(driver, video_url, [], ready=extract_video_fields)
+        upload_date = None
+        if fields["upload_date"]:
+            try:
+                upload_date = convert_iso_to_datetime(fields["upload_date"])
+            except ValueError:
+                logger.debug("Unparseable uploadDate %r on %s", fields["upload_date"], video_url)
+        return _video_data(video_url, fields["video_title"], fields["views"], fields["likes"], fields["dislikes"],
+                           fields["channel_url"], fields["channel_name"], fields["comment_count"],
+                           upload_date or _upload_date_from_tooltip(driver), fields["hashtags"])
+
+    load_page(driver, video_url, VIDEO_PAGE_ELEMENTS)
+    upload_date = _upload_date_from_tooltip(driver)
+
+    with stage("scraper.find_elements"):
+        parent_hashtag_element = _find_field(driver, "hashtags", HASHTAGS_XPATH)
+        anchor_tags = parent_hashtag_element.find_elements(By.XPATH, './/a')
+        hashtags = [anchor.find_element(By.XPATH, './div/div[2]').text for anchor in anchor_tags]
+
+        video_title = _find_field(driver, "video_title", TITLE_XPATH).text
+        views = _find_field(driver, "views", VIEWS_XPATH).text
+        likes = _find_field(driver, "likes", LIKES_XPATH).text
+        dislikes = _find_field(driver, "dislikes", DISLIKES_XPATH).text
+        channel_url = _find_field(driver, "channel_url", CHANNEL_LINK_XPATH).get_attribute("href")
+        channel_name = _find_field(driver, "channel_name", CHANNEL_NAME_XPATH).text
+        comment_count = _find_field(driver, "comment_count", COMMENT_COUNT_XPATH).text
+
+    return _video_data(video_url, video_title, views, likes, dislikes, channel_url, channel_name, comment_count, upload_date, hashtags)
+
+@timed
 def search_hashtag_videos(driver, hashtag):
     """
     Searches for videos under a specific hashtag on Bitchute.
@@ -90,14 +390,4 @@ def search_hashtag_videos(driver, hashtag):
     """
     search = urllib.parse.quote(hashtag)
     url = f"https://www.bitchute.com/hashtag/{search}"
-    driver.get(url)
-    time.sleep(10)
-    
-    videos_link_list = []
-    videos_links = driver.find_elements(By.XPATH, '//*[@id="video-card"]/div[2]/div/div[2]/a[1]')
-    
-    for video in videos_links:
-        link = video.get_attribute("href")
-        videos_link_list.append(link)
-    
-    return videos_link_list
\ No newline at end of file
+    return _collect_video_links(driver, url)
\ No newline at end of file
@@ -0,0 +1,381 @@
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime, time, timedelta
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from config import SNAPSHOT_DIR, SNAPSHOT_BATCH_ROWS
+from db import close_connections, get_read_connection
+from sql_operations import TREND_METRICS, to_hour
+from telemetry import timed
+
+logger = logging.getLogger(__name__)
+
+# The file naming the published snapshot directory, replaced atomically on every publish
+CURRENT_FILE = "CURRENT"
+
+METRIC_NAMES = pa.array(list(TREND_METRICS))
+
+# A trend sample: its entity is implied by its row range, which the entity's table records
+SAMPLE_SCHEMA = pa.schema([
+    ("metric", pa.dictionary(pa.int8(), pa.string())),
+    ("t", pa.timestamp("s")),
+    ("c", pa.int64()),
+])
+
+VIDEO_SCHEMA = pa.schema([
+    ("video_id", pa.int64()),
+    ("video_title", pa.string()),
+    ("video_url", pa.string()),
+    ("video_views", pa.int64()),
+    ("video_likes", pa.int64()),
+    ("video_dislikes", pa.int64()),
+    ("video_channel_url", pa.string()),
+    ("video_channel_name", pa.string()),
+    ("video_comments_count", pa.int64()),
+    ("video_upload_date", pa.string()),
+    ("video_hashtags", pa.string()),
+    ("video_info_integrity_score", pa.int64()),
+    ("sample_offset", pa.int64()),
+    ("sample_count", pa.int64()),
+])
+
+CHANNEL_SCHEMA = pa.schema([
+    ("channel_url", pa.string()),
+    ("channel_name", pa.string()),
+    ("video_count", pa.int64()),
+    ("views", pa.int64()),
+    ("likes", pa.int64()),
+    ("dislikes", pa.int64()),
+    ("comments", pa.int64()),
+    ("integrity_score_sum", pa.int64()),
+    ("sample_offset", pa.int64()),
+    ("sample_count", pa.int64()),
+])
+
+# Columns of the dashboard's search frame (see dashboard_data.fetch_search_frame), by snapshot column
+SEARCH_FRAME_COLUMNS = {
+    "video_info_integrity_score": "Integrity_Score",
+    "video_views": "Views",
+    "video_likes": "Likes",
+    "video_dislikes": "Dislikes",
+    "video_comments_count": "Comments",
+    "video_channel_name": "Channel",
+    "video_channel_url": "Channel_Url",
+}
+
+def _fetch_batches(cursor, sql):
+    """
+    Runs a query and yields its rows in batches of SNAPSHOT_BATCH_ROWS, as lists of columns.
+    """
+    cursor.execute(sql)
+    while True:
+        rows = cursor.fetchmany(SNAPSHOT_BATCH_ROWS)
+        if not rows:
+            return
+        yield list(zip(*rows))
+
+def _write_samples(cursor, sql, path):
+    """
+    Writes a samples table, ordered by entity, to an Arrow IPC file.
+
+    Parameters:
+        cursor (sqlite3.Cursor): A cursor inside the export's read transaction.
+        sql (str): Selects (key, metric, t, c) ordered by key, metric and t.
+        path (str): The file to write.
+
+    Returns:
+        dict: The (offset, count) row range of each key's samples in the file.
+    """
+    ranges = {}
+    written = 0
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, SAMPLE_SCHEMA) as writer:
+        for keys, metrics, times, counts in _fetch_batches(cursor, sql):
+            keys = np.array(keys, dtype=object)
+            starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+            for start, end in zip(starts, np.append(starts[1:], len(keys))):
+                offset, count = ranges.get(keys[start], (written + start, 0))
+                ranges[keys[start]] = (offset, count + end - start)
+
+            indices = pc.cast(pc.index_in(pa.array(metrics), value_set=METRIC_NAMES), pa.int8())
+            writer.write_batch(pa.record_batch([
+                pa.DictionaryArray.from_arrays(indices, METRIC_NAMES),
+                pc.multiply(pa.array(times, pa.int64()), 3600).cast(pa.timestamp("s")),
+                pa.array(counts, pa.int64()),
+            ], schema=SAMPLE_SCHEMA))
+            written += len(keys)
+    return ranges
+
+def _write_table(cursor, sql, schema, ranges, path):
+    """
+    Writes a table to an Arrow IPC file, with the row range of each row's samples.
+
+    Parameters:
+        cursor (sqlite3.Cursor): A cursor inside the export's read transaction.
+        sql (str): Selects the schema's columns except the sample range, key first.
+        schema (pyarrow.Schema): The file's schema, ending with sample_offset and sample_count.
+        ranges (dict): Sample row ranges by key, from _write_samples.
+        path (str): The file to write.
+    """
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+        for columns in _fetch_batches(cursor, sql):
+            sample_ranges = [ranges.get(key, (0, 0)) for key in columns[0]]
+            columns += [[offset for offset, _ in sample_ranges], [count for _, count in sample_ranges]]
+            writer.write_batch(pa.record_batch([pa.array(column, field.type) for column, field in zip(columns, schema)], schema=schema))
+
+def _current_name(directory):
+    """
+    Returns the name of the published snapshot under `directory`, or None if there is none.
+    """
+    try:
+        with open(os.path.join(directory, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+@timed
+def export_snapshot(directory=None):
+    """
+    Publishes a columnar snapshot of the catalog for the dashboard.
+
+    The videos, the channel rollup and both samples tables are read in one read transaction
+    and written as uncompressed Arrow IPC files, which readers memory-map without copying.
+    Videos and channels are stored sorted by URL and samples in the same key order, each video
+    and channel recording the row range of its own, so a series is a binary search and a
+    zero-copy slice. Each snapshot goes to its own directory, named after the write generation,
+    and CURRENT is switched to it atomically; the previous snapshot is kept for readers that are
+    still opening it, older ones are deleted.
+
+    Parameters:
+        directory (str): Where snapshots are published; defaults to SNAPSHOT_DIR.
+
+    Returns:
+        int or None: The write generation exported, or None if the published snapshot is already current.
+    """
+    directory = directory or SNAPSHOT_DIR
+    conn = get_read_connection()
+    cursor = conn.cursor()
+    os.makedirs(directory, exist_ok=True)
+
+    cursor.execute('BEGIN')
+    try:
+        generation = cursor.execute('SELECT generation FROM write_generation WHERE id = 0').fetchone()[0]
+        if _current_name(directory) == str(generation):
+            return None
+
+        staging = os.path.join(directory, f"{generation}.tmp")
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        video_ranges = _write_samples(cursor, 'SELECT video_id, metric, t, c FROM trend_samples ORDER BY video_id, metric, t',
+                                      os.path.join(staging, "video_samples.arrow"))
+        channel_ranges = _write_samples(cursor, 'SELECT channel_url, metric, t, c FROM channel_trend_samples ORDER BY channel_url, metric, t',
+                                        os.path.join(staging, "channel_samples.arrow"))
+        _write_table(cursor, f'SELECT {", ".join(VIDEO_SCHEMA.names[:-2])} FROM videos ORDER BY video_url',
+                     VIDEO_SCHEMA, video_ranges, os.path.join(staging, "videos.arrow"))
+        _write_table(cursor, f'SELECT {", ".join(CHANNEL_SCHEMA.names[:-2])} FROM channels ORDER BY channel_url',
+                     CHANNEL_SCHEMA, channel_ranges, os.path.join(staging, "channels.arrow"))
+    finally:
+        cursor.execute('COMMIT')
+
+    published = os.path.join(directory, str(generation))
+    shutil.rmtree(published, ignore_errors=True)
+    os.rename(staging, published)
+    previous = _current_name(directory)
+    with open(os.path.join(directory, f"{CURRENT_FILE}.tmp"), "w") as f:
+        f.write(str(generation))
+    os.replace(os.path.join(directory, f"{CURRENT_FILE}.tmp"), os.path.join(directory, CURRENT_FILE))
+
+    for name in os.listdir(directory):
+        if name not in (str(generation), previous, CURRENT_FILE):
+            shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+    return generation
+
+class SnapshotExporter:
+    """
+    Publishes snapshots on a background thread, so exporting never holds up scraping.
+
+    request() only flags that the database may have changed, and returns at once. Requests that
+    arrive while an export is running are coalesced into a single export after it, which reads
+    everything written up to then; export_snapshot skips it if nothing was written. Readers keep
+    seeing the previous snapshot until CURRENT is switched to the new one.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self._requested = threading.Event()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="snapshot-exporter", daemon=True)
+        self._thread.start()
+
+    def request(self):
+        """
+        Asks for the snapshot to be brought up to date.
+        """
+        self._requested.set()
+
+    def close(self):
+        """
+        Stops the exporter thread, once the export in progress, if any, is published.
+        """
+        self._stopping = True
+        self._requested.set()
+        self._thread.join()
+
+    def _run(self):
+        """
+        Exports once per batch of requests until stopped; a failed export is logged and retried on the next request.
+        """
+        try:
+            while True:
+                self._requested.wait()
+                if self._stopping:
+                    return
+                self._requested.clear()
+                try:
+                    export_snapshot(self.directory)
+                except Exception:
+                    logger.exception("Snapshot export failed")
+        finally:
+            close_connections()
+
+def _map_table(path):
+    """
+    Opens an Arrow IPC file as a table backed by a memory map of the file.
+    """
+    return pa.ipc.open_file(pa.memory_map(path)).read_all()
+
+def _series(samples, metric, start_date, end_date):
+    """
+    Filters one entity's samples to a metric and an inclusive date range.
+
+    The samples are a short slice, so this works on NumPy views of its columns: a chain of Arrow
+    compute calls and a pandas conversion would cost far more than the data.
+
+    Returns:
+        list: {'t', 'c'} points in time order, t in hours since the epoch as the database stores it.
+    """
+    start = to_hour(datetime.combine(start_date, time()))
+    end = to_hour(datetime.combine(end_date + timedelta(days=1), time()))
+    hours = samples["t"].cast(pa.int64()).to_numpy() // 3600
+    selected = pc.equal(samples["metric"], metric).to_numpy() & (hours >= start) & (hours < end)
+    return [{'t': t, 'c': c} for t, c in zip(hours[selected].tolist(), samples["c"].to_numpy()[selected].tolist())]
+
+def _find_row(column, key):
+    """
+    Binary-searches a string column sorted as SQLite sorts text (NULLs first, then by UTF-8 bytes).
+
+    Returns:
+        int or None: The row holding `key`, or None if it is not in the column.
+    """
+    low, high = 0, len(column)
+    while low < high:
+        middle = (low + high) // 2
+        value = column[middle].as_py()
+        if value is None or value < key:
+            low = middle + 1
+        else:
+            high = middle
+    return low if low < len(column) and column[low].as_py() == key else None
+
+def _search_columns(videos):
+    """
+    Converts the search frame's columns of a videos table to pandas, under the dashboard's names.
+    """
+    return videos.select(list(SEARCH_FRAME_COLUMNS)).rename_columns(list(SEARCH_FRAME_COLUMNS.values())).to_pandas()
+
+class Snapshot:
+    """
+    A published snapshot, memory-mapped once per process and shared by every dashboard session.
+
+    The tables are read-only views of the mapped files: the operating system shares their pages
+    between processes, and filters and slices run vectorized over them without copying the data.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.videos = _map_table(os.path.join(path, "videos.arrow"))
+        self.channels = _map_table(os.path.join(path, "channels.arrow"))
+        self.video_samples = _map_table(os.path.join(path, "video_samples.arrow"))
+        self.channel_samples = _map_table(os.path.join(path, "channel_samples.arrow"))
+        self._search_frame = None
+        self._lock = threading.Lock()
+
+    def search_frame(self, video_ids=None):
+        """
+        Builds the dashboard's search frame from the videos table.
+
+        Parameters:
+            video_ids (list): The videos to include, or None for all of them.
+
+        Returns:
+            pandas.DataFrame: The columns of dashboard_data.fetch_search_frame. The unfiltered frame
+            is built once per snapshot and shared, so it must not be modified.
+        """
+        if video_ids is not None:
+            return _search_columns(self.videos.filter(pc.is_in(self.videos["video_id"], value_set=pa.array(video_ids, pa.int64()))))
+        with self._lock:
+            if self._search_frame is None:
+                self._search_frame = _search_columns(self.videos)
+            return self._search_frame
+
+    def _samples(self, table, samples, key_column, key):
+        """
+        Slices out the samples of the row of `table` whose `key_column` is `key`.
+
+        Returns:
+            pyarrow.Table or None: The samples, or None if the key is not in the snapshot.
+        """
+        row = _find_row(table[key_column], key)
+        if row is None:
+            return None
+        return samples.slice(table["sample_offset"][row].as_py(), table["sample_count"][row].as_py())
+
+    def trend(self, entity, key, metric, start_date, end_date):
+        """
+        Reads one trend series within a date range, like sql_operations.fetch_trend.
+
+        Parameters:
+            entity (str): 'video' or 'channel'.
+            key (str): The video URL or channel URL.
+            metric (str): The metric name (see TREND_METRICS).
+            start_date (datetime.date): The first day to include.
+            end_date (datetime.date): The last day to include.
+
+        Returns:
+            list or None: {'t', 'c'} points like fetch_trend's, or None if the key is not in the snapshot.
+        """
+        if entity == 'video':
+            samples = self._samples(self.videos, self.video_samples, "video_url", key)
+        elif entity == 'channel':
+            samples = self._samples(self.channels, self.channel_samples, "channel_url", key)
+        else:
+            raise ValueError(f"Unknown trend entity: {entity}")
+        if samples is None:
+            return None
+        return _series(samples, metric, start_date, end_date)
+
+_lock = threading.Lock()
+_snapshot = None
+
+def load_snapshot(directory=None):
+    """
+    Returns the published snapshot, mapping it the first time each new one is seen.
+
+    Parameters:
+        directory (str): Where snapshots are published; defaults to SNAPSHOT_DIR.
+
+    Returns:
+        Snapshot or None: The current snapshot, or None if none has been published.
+    """
+    global _snapshot
+    directory = directory or SNAPSHOT_DIR
+    name = _current_name(directory)
+    if name is None:
+        return None
+    path = os.path.join(directory, name)
+    with _lock:
+        if _snapshot is None or _snapshot.path != path:
+            _snapshot = Snapshot(path)
+        return _snapshot
@@ -1,83 +1,549 @@
-import sqlite3
 import json
+import re
+from datetime import datetime, timedelta
+from db import get_connection, get_read_connection
+from telemetry import timed
+
+# Maps each trend metric to the legacy JSON column it used to be stored in.
+TREND_METRICS = {
+    'views': 'video_views_trend',
+    'likes': 'video_likes_trend',
+    'dislikes': 'video_dislikes_trend',
+    'comments': 'video_comments_trend',
+}
+
+# Upsert rather than INSERT OR REPLACE, so the update triggers see the old value and the
+# channel rollup can apply the difference
+UPSERT_TREND_SAMPLE = '''INSERT INTO trend_samples (video_id, metric, t, c) VALUES (?, ?, ?, ?)
+                         ON CONFLICT (video_id, metric, t) DO UPDATE SET c = excluded.c'''
+
+# New videos are inserted; known ones get their latest title, counts and hashtags,
+# keeping their upload date, channel and integrity score
+UPSERT_VIDEO = '''INSERT INTO videos (video_title, video_url, video_views, video_likes, video_dislikes, video_channel_url, video_channel_name, video_comments_count, video_upload_date, video_hashtags, video_info_integrity_score)
+                  VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                  ON CONFLICT (video_url) DO UPDATE SET video_title = excluded.video_title, video_views = excluded.video_views,
+                    video_likes = excluded.video_likes, video_dislikes = excluded.video_dislikes, video_channel_name = excluded.video_channel_name,
+                    video_comments_count = excluded.video_comments_count, video_hashtags = excluded.video_hashtags'''
+
+# Same as UPSERT_TREND_SAMPLE, addressing the video by URL
+UPSERT_TREND_SAMPLE_BY_URL = '''INSERT INTO trend_samples (video_id, metric, t, c) SELECT video_id, ?, ?, ? FROM videos WHERE video_url = ?
+                                ON CONFLICT (video_id, metric, t) DO UPDATE SET c = excluded.c'''
+
+# Columns a compacted sample adds; NULL on hourly samples, whose range is just c
+COMPACTED_COLUMNS = {'c_min': 'INTEGER', 'c_max': 'INTEGER'}
+
+# A sample time later than any real one, closing the open-ended ranges of the channel series below
+LAST_HOUR = 1 << 40
+
+# A channel's series has a point at every hour any of its videos was sampled, holding the sum of each video's
+# latest count at that hour, so videos that were not sampled in that hour still count. A sample thus moves the
+# channel's points from its own hour up to the video's next sample, by its difference from the video's previous
+# sample; this shifts those points of the channel of {row}'s video by {delta}
+SHIFT_CHANNEL_SAMPLES = f'''UPDATE channel_trend_samples SET c = c + ({{delta}}), c_min = c_min + ({{delta}}), c_max = c_max + ({{delta}})
+                            WHERE channel_url = (SELECT video_channel_url FROM videos WHERE video_id = {{row}}.video_id)
+                              AND metric = {{row}}.metric AND t >= {{row}}.t
+                              AND t < COALESCE((SELECT MIN(n.t) FROM trend_samples n
+                                                WHERE n.video_id = {{row}}.video_id AND n.metric = {{row}}.metric AND n.t > {{row}}.t), {LAST_HOUR})'''
+
+# The count of {row}'s video before {row}, or 0 for its first sample
+PREVIOUS_COUNT = '''COALESCE((SELECT p.c FROM trend_samples p WHERE p.video_id = {row}.video_id AND p.metric = {row}.metric
+                               AND p.t < {row}.t ORDER BY p.t DESC LIMIT 1), 0)'''
+
+# The triggers keeping 'channel_trend_samples' current as samples are written, by name. Bulk rewrites of the
+# samples drop them and recompute the series with RECOMPUTE_CHANNEL_SAMPLES instead (see _recompute_channel_samples)
+TREND_TRIGGERS = {
+    'channel_trend_sample_insert': f'''CREATE TRIGGER channel_trend_sample_insert AFTER INSERT ON trend_samples BEGIN
+                            INSERT INTO channel_trend_samples (channel_url, metric, t, c)
+                            SELECT v.video_channel_url, new.metric, new.t,
+                                   COALESCE((SELECT s.c FROM channel_trend_samples s WHERE s.channel_url = v.video_channel_url
+                                               AND s.metric = new.metric AND s.t < new.t ORDER BY s.t DESC LIMIT 1), 0)
+                            FROM videos v WHERE v.video_id = new.video_id
+                            ON CONFLICT (channel_url, metric, t) DO NOTHING;
+                            {SHIFT_CHANNEL_SAMPLES.format(row='new', delta=f"new.c - {PREVIOUS_COUNT.format(row='new')}")};
+                          END''',
+    'channel_trend_sample_update': f'''CREATE TRIGGER channel_trend_sample_update AFTER UPDATE OF c ON trend_samples WHEN new.c IS NOT old.c BEGIN
+                            {SHIFT_CHANNEL_SAMPLES.format(row='new', delta='new.c - old.c')};
+                          END''',
+    # A channel point goes once none of the channel's videos has a sample at its hour, as if rebuilt
+    'channel_trend_sample_delete': f'''CREATE TRIGGER channel_trend_sample_delete AFTER DELETE ON trend_samples BEGIN
+                            {SHIFT_CHANNEL_SAMPLES.format(row='old', delta=f"{PREVIOUS_COUNT.format(row='old')} - old.c")};
+                            DELETE FROM channel_trend_samples
+                            WHERE channel_url = (SELECT video_channel_url FROM videos WHERE video_id = old.video_id)
+                              AND metric = old.metric AND t = old.t
+                              AND NOT EXISTS (SELECT 1 FROM trend_samples s JOIN videos v ON v.video_id = s.video_id
+                                              WHERE v.video_channel_url = channel_trend_samples.channel_url
+                                                AND s.metric = old.metric AND s.t = old.t);
+                          END''',
+}
+
+# Recomputes the channel series in [:start, :end) the way the triggers build it: each sample's difference from
+# the video's previous one, summed per channel and hour and accumulated onto the channel's last point before
+# the range. Where any video's point at that hour was compacted, the channel's range (c_min, c_max) is its
+# count widened by the ranges of those points
+RECOMPUTE_CHANNEL_SAMPLES = '''INSERT INTO channel_trend_samples (channel_url, metric, t, c, c_min, c_max)
+                               SELECT channel_url, metric, t, c, CASE WHEN compacted > 0 THEN c + low END, CASE WHEN compacted > 0 THEN c + high END
+                               FROM (SELECT p.*, SUM(delta) OVER (PARTITION BY channel_url, metric ORDER BY t)
+                                                 + COALESCE((SELECT b.c FROM channel_trend_samples b WHERE b.channel_url = p.channel_url
+                                                               AND b.metric = p.metric AND b.t < :start ORDER BY b.t DESC LIMIT 1), 0) AS c
+                                     FROM (SELECT v.video_channel_url AS channel_url, d.metric, d.t, SUM(d.delta) AS delta,
+                                                  SUM(d.low) AS low, SUM(d.high) AS high, COUNT(d.c_min) AS compacted
+                                           FROM (SELECT video_id, metric, t, c_min, COALESCE(c_min, c) - c AS low, COALESCE(c_max, c) - c AS high,
+                                                        c - COALESCE(LAG(c) OVER (PARTITION BY video_id, metric ORDER BY t),
+                                                                     (SELECT e.c FROM trend_samples e WHERE e.video_id = s.video_id AND e.metric = s.metric
+                                                                        AND e.t < :start ORDER BY e.t DESC LIMIT 1), 0) AS delta
+                                                 FROM trend_samples s WHERE t >= :start AND t < :end) d
+                                           JOIN videos v ON v.video_id = d.video_id
+                                           GROUP BY v.video_channel_url, d.metric, d.t) p)'''
+
+# Sample times (t) are stored as whole hours since the Unix epoch: a 3-byte integer instead of a
+# 19-character 'YYYY-MM-DD HH:00:00' string repeated in every row and index entry
+EPOCH = datetime(1970, 1, 1)
+
+# Converts a 'YYYY-MM-DD HH:MM:SS' column to the hour it falls in, for migrating older databases
+TEXT_TO_HOUR = "CAST(strftime('%s', {column}) AS INTEGER) / 3600"
+
+# Samples inside a run of equal counts within one day: the samples before and after, on the same day,
+# hold the same count. A chart drawn through the remaining points is unchanged, and as every day keeps
+# its first and last sample, so are whole-day ranges and the daily points of trend_retention. Channel
+# totals carry each video's last count forward, so they are unchanged too; only channel points left with
+# no video sample at their hour go (see TREND_TRIGGERS). Only hourly samples qualify; compacted points are left alone
+FLAT_SAMPLES = '''SELECT video_id, metric, t FROM (
+                    SELECT video_id, metric, t, c, c_min, LAG(c) OVER w AS previous_c, LAG(t) OVER w AS previous_t,
+                           LEAD(c) OVER w AS next_c, LEAD(t) OVER w AS next_t
+                    FROM trend_samples WHERE {where}
+                    WINDOW w AS (PARTITION BY video_id, metric ORDER BY t))
+                  WHERE c_min IS NULL AND c = previous_c AND c = next_c AND previous_t / 24 = t / 24 AND next_t / 24 = t / 24'''
+
+def to_hour(time):
+    """
+    Converts a UTC time to the stored form of a sample time.
+
+    Parameters:
+        time (datetime.datetime): A naive UTC time.
+
+    Returns:
+        int: The whole hours from the Unix epoch to `time`.
+    """
+    return int((time - EPOCH).total_seconds()) // 3600
+
+def from_hour(hour):
+    """
+    Converts a stored sample time back to a naive UTC datetime.
+
+    Parameters:
+        hour (int): Whole hours since the Unix epoch.
+
+    Returns:
+        datetime.datetime: The start of that hour.
+    """
+    return EPOCH + timedelta(hours=hour)
+
+def _add_missing_columns(cursor, table, columns):
+    """
+    Adds the columns a table created by an older version lacks.
+
+    Parameters:
+        cursor (sqlite3.Cursor): A cursor on the read-write connection.
+        table (str): The table name.
+        columns (dict): Column definitions by name.
+    """
+    existing = {row[1] for row in cursor.execute(f'PRAGMA table_info({table})')}
+    for name, definition in columns.items():
+        if name not in existing:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {definition}')
+
+def _set_aside_text_times(cursor):
+    """
+    Renames the trend tables of a database that still stores sample times as text, so that
+    create_db creates them afresh and _encode_text_times can copy the samples over.
+
+    The triggers on 'trend_samples' are dropped, to be recreated on the new table, and the
+    compaction progress is discarded: compaction is idempotent, so it just starts over.
+
+    Parameters:
+        cursor (sqlite3.Cursor): A cursor on the read-write connection.
+
+    Returns:
+        bool: Whether the tables were in the text encoding.
+    """
+    columns = {row[1]: row[2] for row in cursor.execute('PRAGMA table_info(trend_samples)')}
+    if columns.get('t') != 'TEXT':
+        return False
+    _drop_trend_triggers(cursor)
+    for table in ('trend_samples', 'channel_trend_samples'):
+        if cursor.execute('SELECT 1 FROM sqlite_master WHERE name = ?', (table,)).fetchone():
+            cursor.execute(f'ALTER TABLE {table} RENAME TO {table}_text')
+    cursor.execute('DROP TABLE IF EXISTS trend_compaction')
+    return True
+
+def _encode_text_times(cursor, table):
+    """
+    Copies the samples set aside by _set_aside_text_times into the new table, converting their times to hours.
+
+    Parameters:
+        cursor (sqlite3.Cursor): A cursor on the read-write connection.
+        table (str): The table to fill; its old rows are in '{table}_text', which is dropped afterwards.
+    """
+    columns = [row[1] for row in cursor.execute(f'PRAGMA table_info({table}_text)')]
+    if not columns:
+        return
+    values = ', '.join(TEXT_TO_HOUR.format(column=column) if column == 't' else column for column in columns)
+    cursor.execute(f'INSERT INTO {table} ({", ".join(columns)}) SELECT {values} FROM {table}_text')
+    cursor.execute(f'DROP TABLE {table}_text')
+
+def _drop_trend_triggers(cursor):
+    """
+    Drops the triggers in TREND_TRIGGERS, inside the caller's write transaction.
+
+    Parameters:
+        cursor (sqlite3.Cursor): A cursor on the read-write connection.
+    """
+    for name in TREND_TRIGGERS:
+        cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+
+def _create_trend_triggers(cursor):
+    """
+    Creates the triggers in TREND_TRIGGERS, inside the caller's write transaction.
+
+    Parameters:
+        cursor (sqlite3.Cursor): A cursor on the read-write connection.
+    """
+    for sql in TREND_TRIGGERS.values():
+        cursor.execute(sql)
+
+def _recompute_channel_samples(cursor, start, end):
+    """
+    Replaces the channel series between two hours with RECOMPUTE_CHANNEL_SAMPLES, inside the caller's
+    write transaction. The points before `start` must already be correct, and the trend triggers
+    must be dropped if the caller has just rewritten the samples.
+
+    Parameters:
+        cursor (sqlite3.Cursor): A cursor on the read-write connection.
+        start (int): The first hour to recompute (see to_hour).
+        end (int): The hour to stop before.
+    """
+    cursor.execute('DELETE FROM channel_trend_samples WHERE t >= ? AND t < ?', (start, end))
+    cursor.execute(RECOMPUTE_CHANNEL_SAMPLES, {'start': start, 'end': end})
 
 def create_db():
     """
     Creates the SQLite database and the 'videos' table if it doesn't exist.
     """
-    conn = sqlite3.connect('bitchute.db')
-    cursor = conn.cursor()
+    conn = get_connection()
+    with conn:
+        cursor = conn.cursor()
+        reencoded = _set_aside_text_times(cursor)
+
+        cursor.execute('''CREATE TABLE IF NOT EXISTS videos (
+                            video_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            video_title TEXT,
+                            video_url TEXT UNIQUE,
+                            video_views INTEGER,
+                            video_likes INTEGER,
+                            video_dislikes INTEGER,
+                            video_channel_url TEXT,
+                            video_channel_name TEXT,
+                            video_comments_count INTEGER,
+                            video_upload_date TEXT,
+                            video_hashtags TEXT,
+                            video_info_integrity_score INTEGER,
+                            video_comments_trend TEXT,
+                            video_views_trend TEXT,
+                            video_likes_trend TEXT,
+                            video_dislikes_trend TEXT)''')
+
+        # Hourly samples, one row per (video, metric, hour), t in hours since the epoch (see to_hour); samples
+        # inside a day's run of equal counts are not kept (see FLAT_SAMPLES). Once compacted (see trend_retention),
+        # a row stands for a whole day or week: c is the last count in it, c_min and c_max its range
+        cursor.execute('''CREATE TABLE IF NOT EXISTS trend_samples (
+                            video_id INTEGER NOT NULL,
+                            metric TEXT NOT NULL,
+                            t INTEGER NOT NULL,
+                            c INTEGER,
+                            c_min INTEGER,
+                            c_max INTEGER,
+                            PRIMARY KEY (video_id, metric, t)) WITHOUT ROWID''')
+        _add_missing_columns(cursor, 'trend_samples', COMPACTED_COLUMNS)
+        if reencoded:
+            _encode_text_times(cursor, 'trend_samples')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_videos_channel_url ON videos (video_channel_url)')
+        # Sort keys of the paginated video table; the rowid tie-breaker is part of every index
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_videos_views ON videos (video_views)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_videos_upload_date ON videos (video_upload_date)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_videos_integrity_score ON videos (video_info_integrity_score)')
+
+        # Full-text index over titles and hashtags, kept in sync with 'videos' by triggers
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'videos_fts'")
+        fts_exists = cursor.fetchone() is not None
+        cursor.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS videos_fts USING fts5(
+                            video_title, video_hashtags,
+                            content='videos', content_rowid='video_id',
+                            tokenize='unicode61 remove_diacritics 2', prefix='2 3')''')
+        cursor.execute('''CREATE TRIGGER IF NOT EXISTS videos_fts_insert AFTER INSERT ON videos BEGIN
+                            INSERT INTO videos_fts (rowid, video_title, video_hashtags) VALUES (new.video_id, new.video_title, new.video_hashtags);
+                          END''')
+        cursor.execute('''CREATE TRIGGER IF NOT EXISTS videos_fts_delete AFTER DELETE ON videos BEGIN
+                            INSERT INTO videos_fts (videos_fts, rowid, video_title, video_hashtags) VALUES ('delete', old.video_id, old.video_title, old.video_hashtags);
+                          END''')
+        cursor.execute('''CREATE TRIGGER IF NOT EXISTS videos_fts_update AFTER UPDATE OF video_title, video_hashtags ON videos
+                          WHEN old.video_title IS NOT new.video_title OR old.video_hashtags IS NOT new.video_hashtags BEGIN
+                            INSERT INTO videos_fts (videos_fts, rowid, video_title, video_hashtags) VALUES ('delete', old.video_id, old.video_title, old.video_hashtags);
+                            INSERT INTO videos_fts (rowid, video_title, video_hashtags) VALUES (new.video_id, new.video_title, new.video_hashtags);
+                          END''')
+        if not fts_exists:
+            cursor.execute("INSERT INTO videos_fts (videos_fts) VALUES ('rebuild')")
+
+        # Per-channel totals and hourly series, maintained by triggers on every video and sample write
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'channels'")
+        rollup_exists = cursor.fetchone() is not None
+        cursor.execute('''CREATE TABLE IF NOT EXISTS channels (
+                            channel_url TEXT PRIMARY KEY,
+                            channel_name TEXT,
+                            video_count INTEGER NOT NULL DEFAULT 0,
+                            views INTEGER NOT NULL DEFAULT 0,
+                            likes INTEGER NOT NULL DEFAULT 0,
+                            dislikes INTEGER NOT NULL DEFAULT 0,
+                            comments INTEGER NOT NULL DEFAULT 0,
+                            integrity_score_sum INTEGER NOT NULL DEFAULT 0)''')
+        cursor.execute('''CREATE TABLE IF NOT EXISTS channel_trend_samples (
+                            channel_url TEXT NOT NULL,
+                            metric TEXT NOT NULL,
+                            t INTEGER NOT NULL,
+                            c INTEGER NOT NULL,
+                            c_min INTEGER,
+                            c_max INTEGER,
+                            PRIMARY KEY (channel_url, metric, t)) WITHOUT ROWID''')
+        _add_missing_columns(cursor, 'channel_trend_samples', COMPACTED_COLUMNS)
+        if reencoded:
+            _encode_text_times(cursor, 'channel_trend_samples')
+        # Sort keys of the paginated channel table
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_channels_views ON channels (views)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_channels_integrity_score ON channels (CAST(integrity_score_sum AS REAL) / video_count)')
+        cursor.execute('''CREATE TRIGGER IF NOT EXISTS channels_video_insert AFTER INSERT ON videos BEGIN
+                            INSERT INTO channels (channel_url, channel_name, video_count, views, likes, dislikes, comments, integrity_score_sum)
+                            VALUES (new.video_channel_url, new.video_channel_name, 1, new.video_views, new.video_likes, new.video_dislikes, new.video_comments_count, new.video_info_integrity_score)
+                            ON CONFLICT (channel_url) DO UPDATE SET channel_name = excluded.channel_name, video_count = video_count + 1,
+                              views = views + excluded.views, likes = likes + excluded.likes, dislikes = dislikes + excluded.dislikes,
+                              comments = comments + excluded.comments, integrity_score_sum = integrity_score_sum + excluded.integrity_score_sum;
+                          END''')
+        cursor.execute('''CREATE TRIGGER IF NOT EXISTS channels_video_delete AFTER DELETE ON videos BEGIN
+                            UPDATE channels SET video_count = video_count - 1,
+                              views = views - old.video_views, likes = likes - old.video_likes, dislikes = dislikes - old.video_dislikes,
+                              comments = comments - old.video_comments_count, integrity_score_sum = integrity_score_sum - old.video_info_integrity_score
+                            WHERE channel_url = old.video_channel_url;
+                          END''')
+        cursor.execute('''CREATE TRIGGER IF NOT EXISTS channels_video_update AFTER UPDATE OF video_channel_url, video_channel_name, video_views, video_likes, video_dislikes, video_comments_count, video_info_integrity_score ON videos BEGIN
+                            UPDATE channels SET video_count = video_count - 1,
+                              views = views - old.video_views, likes = likes - old.video_likes, dislikes = dislikes - old.video_dislikes,
+                              comments = comments - old.video_comments_count, integrity_score_sum = integrity_score_sum - old.video_info_integrity_score
+                            WHERE channel_url = old.video_channel_url;
+                            INSERT INTO channels (channel_url, channel_name, video_count, views, likes, dislikes, comments, integrity_score_sum)
+                            VALUES (new.video_channel_url, new.video_channel_name, 1, new.video_views, new.video_likes, new.video_dislikes, new.video_comments_count, new.video_info_integrity_score)
+                            ON CONFLICT (channel_url) DO UPDATE SET channel_name = excluded.channel_name, video_count = video_count + 1,
+                              views = views + excluded.views, likes = likes + excluded.likes, dislikes = dislikes + excluded.dislikes,
+                              comments = comments + excluded.comments, integrity_score_sum = integrity_score_sum + excluded.integrity_score_sum;
+                          END''')
+        # Trend triggers left by an older version are replaced, and the channel series rebuilt to match them
+        cursor.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'trend_samples'")
+        stale_triggers = dict(cursor.fetchall()) != TREND_TRIGGERS
+        if stale_triggers:
+            _drop_trend_triggers(cursor)
+            _create_trend_triggers(cursor)
+
+        # Refresh queue: each video's next scrape time, ordered by the index, and the state its interval is computed from
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'refresh_schedule'")
+        schedule_exists = cursor.fetchone() is not None
+        cursor.execute('''CREATE TABLE IF NOT EXISTS refresh_schedule (
+                            video_id INTEGER PRIMARY KEY,
+                            next_refresh TEXT NOT NULL,
+                            last_refresh TEXT,
+                            last_views INTEGER)''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_refresh_schedule_next ON refresh_schedule (next_refresh)')
+        cursor.execute('''CREATE TRIGGER IF NOT EXISTS refresh_schedule_video_insert AFTER INSERT ON videos BEGIN
+                            INSERT OR IGNORE INTO refresh_schedule (video_id, next_refresh, last_refresh, last_views)
+                            VALUES (new.video_id, datetime('now', '+1 hour'), datetime('now'), new.video_views);
+                          END''')
+        cursor.execute('''CREATE TRIGGER IF NOT EXISTS refresh_schedule_video_delete AFTER DELETE ON videos BEGIN
+                            DELETE FROM refresh_schedule WHERE video_id = old.video_id;
+                          END''')
+        if not schedule_exists:
+            # Existing videos are all due straight away
+            cursor.execute("INSERT OR IGNORE INTO refresh_schedule (video_id, next_refresh) SELECT video_id, datetime('now') FROM videos")
 
-    cursor.execute('''CREATE TABLE IF NOT EXISTS videos (
-                        video_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        video_title TEXT,
-                        video_url TEXT UNIQUE,
-                        video_views INTEGER,
-                        video_likes INTEGER,
-                        video_dislikes INTEGER,
-                        video_channel_url TEXT,
-                        video_channel_name TEXT,
-                        video_comments_count INTEGER,
-                        video_upload_date TEXT,
-                        video_hashtags TEXT,
-                        video_info_integrity_score INTEGER,
-                        video_comments_trend TEXT,
-                        video_views_trend TEXT,
-                        video_likes_trend TEXT,
-                        video_dislikes_trend TEXT)''')
+        # Discovery frontier: search queries and hashtags to (re)visit, and found video URLs not yet scraped
+        cursor.execute('''CREATE TABLE IF NOT EXISTS crawl_frontier (
+                            kind TEXT NOT NULL,
+                            value TEXT NOT NULL,
+                            next_visit TEXT NOT NULL,
+                            PRIMARY KEY (kind, value)) WITHOUT ROWID''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_crawl_frontier_next ON crawl_frontier (kind, next_visit)')
 
-    conn.commit()
-    conn.close()
+        # How far back each retention tier has compacted the trend history
+        cursor.execute('''CREATE TABLE IF NOT EXISTS trend_compaction (
+                            tier TEXT PRIMARY KEY,
+                            compacted_until INTEGER NOT NULL)''')
 
-def insert_video_data(video_data):
+        # Single-row counter bumped by every write, so readers can tell when cached results are stale
+        cursor.execute('''CREATE TABLE IF NOT EXISTS write_generation (
+                            id INTEGER PRIMARY KEY CHECK (id = 0),
+                            generation INTEGER NOT NULL)''')
+        cursor.execute('INSERT OR IGNORE INTO write_generation (id, generation) VALUES (0, 0)')
+
+    migrated = migrate_trend_columns()
+    suppressed = reencoded or migrated
+    if suppressed:
+        # This recomputes the channel series as well
+        suppress_flat_samples()
+    if not rollup_exists or (stale_triggers and not suppressed):
+        rebuild_channel_rollup()
+    if suppressed:
+        # Give the space freed by the re-encoded and suppressed samples back to the file system
+        conn.execute('VACUUM')
+
+def _bump_write_generation(cursor):
     """
-    Inserts new video data into the database.
+    Marks the database as changed, inside the caller's write transaction.
 
     Parameters:
-        video_data (dict): A dictionary containing video details.
+        cursor (sqlite3.Cursor): A cursor on the read-write connection.
+    """
+    cursor.execute('UPDATE write_generation SET generation = generation + 1 WHERE id = 0')
+
+def fetch_write_generation():
+    """
+    Fetches the write generation, which changes whenever sql_operations commits a write.
+
+    Returns:
+        int: The current generation.
     """
-    conn = sqlite3.connect('bitchute.db')
+    conn = get_read_connection()
     cursor = conn.cursor()
 
-    video_views_trend = json.dumps(video_data['video_views_trend'])
-    video_likes_trend = json.dumps(video_data['video_likes_trend'])
-    video_dislikes_trend = json.dumps(video_data['video_dislikes_trend'])
-    video_comments_trend = json.dumps(video_data['video_comments_trend'])
-    video_hashtags = json.dumps(video_data['video_hashtags'])
+    cursor.execute('SELECT generation FROM write_generation WHERE id = 0')
+    return cursor.fetchone()[0]
+
+def migrate_trend_columns():
+    """
+    Moves trend history out of the legacy JSON columns into the 'trend_samples' table.
+
+    Each migrated JSON column is cleared afterwards, so running the migration again
+    only picks up rows that still carry JSON trend data. The trend triggers are dropped
+    while the samples are inserted, and the channel series is recomputed once afterwards.
+
+    Returns:
+        int: The number of videos whose trend history was migrated.
+    """
+    conn = get_connection()
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute('BEGIN')
+
+        columns = ', '.join(TREND_METRICS.values())
+        cursor.execute(f'''SELECT video_id, {columns} FROM videos
+                           WHERE video_views_trend IS NOT NULL OR video_likes_trend IS NOT NULL
+                              OR video_dislikes_trend IS NOT NULL OR video_comments_trend IS NOT NULL''')
+        rows = cursor.fetchall()
+        if rows:
+            _drop_trend_triggers(cursor)
+
+        for row in rows:
+            video_id = row[0]
+            samples = []
+            for metric, trend_string in zip(TREND_METRICS, row[1:]):
+                if trend_string is None:
+                    continue
+                # Later points win, matching the old drop_duplicates(keep='last') behaviour
+                for point in json.loads(trend_string):
+                    samples.append((video_id, metric, to_hour(datetime.strptime(point['t'], '%Y-%m-%d %H:%M:%S')), point['c']))
+            cursor.executemany(UPSERT_TREND_SAMPLE, samples)
+            cursor.execute(f'''UPDATE videos SET {' = NULL, '.join(TREND_METRICS.values())} = NULL WHERE video_id = ?''', (video_id,))
+        if rows:
+            _recompute_channel_samples(cursor, 0, LAST_HOUR)
+            _create_trend_triggers(cursor)
+            _bump_write_generation(cursor)
+    return len(rows)
+
+def suppress_flat_samples():
+    """
+    Deletes every stored sample inside a day's run of equal counts (see FLAT_SAMPLES).
+
+    write_video_batch suppresses these as samples arrive; this catches up the history of a
+    database migrated from an older version, in one pass over the samples table. The trend
+    triggers are dropped meanwhile, and the channel series is recomputed once afterwards.
+
+    Returns:
+        int: The number of samples deleted.
+    """
+    conn = get_connection()
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute('BEGIN')
+        _drop_trend_triggers(cursor)
+
+        cursor.execute(f'DELETE FROM trend_samples WHERE (video_id, metric, t) IN ({FLAT_SAMPLES.format(where="1")})')
+        deleted = cursor.rowcount
+        _recompute_channel_samples(cursor, 0, LAST_HOUR)
+        _create_trend_triggers(cursor)
+        _bump_write_generation(cursor)
+    return deleted
+
+def rebuild_channel_rollup():
+    """
+    Recomputes the 'channels' and 'channel_trend_samples' rollup tables from scratch.
+
+    The triggers keep both tables current after this; it only needs to run once for a
+    database that predates the rollup or its current triggers, or to repair it. The channel
+    series comes out as the triggers build it (see TREND_TRIGGERS).
+    """
+    conn = get_connection()
+    with conn:
+        cursor = conn.cursor()
 
-    cursor.execute('''INSERT OR IGNORE INTO videos (video_title, video_url, video_views, video_likes, video_dislikes, video_channel_url, video_channel_name, video_comments_count, video_upload_date, video_hashtags, video_info_integrity_score, video_comments_trend, video_views_trend, video_likes_trend, video_dislikes_trend)
-                      VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''', 
-                   (video_data["video_title"], video_data["video_url"], video_data["video_views"], video_data["video_likes"], 
-                    video_data["video_dislikes"], video_data["video_channel_url"], video_data["video_channel_name"], video_data["video_comments_count"], video_data["video_upload_date"],
-                    video_hashtags, video_data['video_info_integrity_score'], video_comments_trend, video_views_trend, video_likes_trend, video_dislikes_trend))
+        cursor.execute('DELETE FROM channels')
+        cursor.execute('''INSERT INTO channels (channel_url, channel_name, video_count, views, likes, dislikes, comments, integrity_score_sum)
+                          SELECT video_channel_url, MAX(video_channel_name), COUNT(*), SUM(video_views), SUM(video_likes),
+                                 SUM(video_dislikes), SUM(video_comments_count), SUM(video_info_integrity_score)
+                          FROM videos GROUP BY video_channel_url''')
 
-    conn.commit()
-    conn.close()
+        _recompute_channel_samples(cursor, 0, LAST_HOUR)
+        _bump_write_generation(cursor)
 
-def update_video_data(video_data):
+@timed
+def write_video_batch(records):
     """
-    Updates existing video data in the database.
+    Writes a batch of scraped videos in a single transaction.
+
+    Each video is inserted or updated, its hourly trend samples are upserted and, if it was
+    refreshed by the scheduler, its next refresh time is stored, all with one executemany per
+    statement instead of a round trip per video. The samples the new ones leave inside a day's
+    run of equal counts are then deleted in one statement (see FLAT_SAMPLES).
 
     Parameters:
-        video_data (dict): A dictionary containing updated video details.
+        records (list): Dicts from process_data.video_record, with the scraped 'video' data, its
+        'sample_time' (see to_hour) and 'samples', and a 'schedule' of (next_refresh, last_refresh, last_views) or None.
     """
-    conn = sqlite3.connect('bitchute.db')
-    cursor = conn.cursor()
+    conn = get_connection()
+    with conn:
+        cursor = conn.cursor()
 
-    video_views_trend = json.dumps(video_data['video_views_trend'])
-    video_likes_trend = json.dumps(video_data['video_likes_trend'])
-    video_dislikes_trend = json.dumps(video_data['video_dislikes_trend'])
-    video_comments_trend = json.dumps(video_data['video_comments_trend'])
-    video_hashtags = json.dumps(video_data['video_hashtags'])
-
-    cursor.execute('''UPDATE videos SET video_title=?, video_views=?, video_likes=?, video_dislikes=?, video_channel_name=?, video_comments_count=?, video_hashtags=?, video_comments_trend=?, video_views_trend=?, video_likes_trend=?, video_dislikes_trend=? 
-                      WHERE video_url=?''', 
-                   (video_data["video_title"], video_data["video_views"], video_data["video_likes"], 
-                    video_data["video_dislikes"], video_data["video_channel_name"], video_data["video_comments_count"],
-                    video_hashtags, video_comments_trend, video_views_trend, video_likes_trend, video_dislikes_trend, video_data["video_url"]))
-    
-    conn.commit()
-    conn.close()
+        cursor.executemany(UPSERT_VIDEO, [
+            (video["video_title"], video["video_url"], video["video_views"], video["video_likes"], video["video_dislikes"],
+             video["video_channel_url"], video["video_channel_name"], video["video_comments_count"], video["video_upload_date"],
+             json.dumps(video['video_hashtags']), video['video_info_integrity_score'])
+            for video in (record['video'] for record in records)])
+        cursor.executemany(UPSERT_TREND_SAMPLE_BY_URL, [
+            (metric, record['sample_time'], count, record['video']['video_url'])
+            for record in records for metric, count in record['samples'].items()])
+        cursor.executemany('''UPDATE refresh_schedule SET next_refresh = ?, last_refresh = ?, last_views = ?
+                              WHERE video_id = (SELECT video_id FROM videos WHERE video_url = ?)''', [
+            record['schedule'] + (record['video']['video_url'],) for record in records if record['schedule']])
+        if records:
+            # Whole days, so every sample's neighbours on its day are seen
+            urls = [record['video']['video_url'] for record in records]
+            where = f"video_id IN (SELECT video_id FROM videos WHERE video_url IN ({', '.join('?' * len(urls))})) AND t >= ?"
+            cursor.execute(f'DELETE FROM trend_samples WHERE (video_id, metric, t) IN ({FLAT_SAMPLES.format(where=where)})',
+                           urls + [min(record['sample_time'] for record in records) // 24 * 24])
+        _bump_write_generation(cursor)
 
 def fetch_video_data(video_url):
     """
@@ -89,7 +555,7 @@ def fetch_video_data(video_url):
     Returns:
         dict or None: A dictionary of video data or None if not found.
     """
-    conn = sqlite3.connect('bitchute.db')
+    conn = get_read_connection()
     cursor = conn.cursor()
     
     query = """
@@ -104,11 +570,7 @@ def fetch_video_data(video_url):
            video_comments_count, 
            video_upload_date, 
            video_hashtags, 
-           video_info_integrity_score, 
-           video_comments_trend, 
-           video_views_trend, 
-           video_likes_trend, 
-           video_dislikes_trend
+           video_info_integrity_score
     FROM videos
     WHERE video_url = ?;
     """
@@ -122,9 +584,9 @@ def fetch_video_data(video_url):
     else:
         record_dict = None
     
-    conn.close()
     return record_dict
 
+@timed
 def fetch_video_url_list():
     """
     Fetches a list of all video URLs from the database.
@@ -132,7 +594,7 @@ def fetch_video_url_list():
     Returns:
         list: A list of video URLs.
     """
-    conn = sqlite3.connect('bitchute.db')
+    conn = get_read_connection()
     cursor = conn.cursor()
 
     query = "SELECT video_url FROM videos"
@@ -146,6 +608,373 @@ def fetch_video_url_list():
     for row in rows:
         video_list.append(row[0])
 
-    conn.close()
+    return video_list
+
+def _time_range(start_date, end_date):
+    """
+    Converts an inclusive date range into bounds on the hourly sample times.
+
+    Parameters:
+        start_date (datetime.date): The first day of the range.
+        end_date (datetime.date): The last day of the range.
+
+    Returns:
+        tuple: (start, end) hours (see to_hour); samples in range satisfy start <= t < end.
+    """
+    start = datetime.combine(start_date, datetime.min.time())
+    return to_hour(start), to_hour(start) + ((end_date - start_date).days + 1) * 24
+
+def fetch_trend(entity, key, metric, start_date, end_date):
+    """
+    Fetches the points of one trend series that fall within a date range.
+
+    The range is applied by the primary key index of the samples table, so the cost
+    depends on the size of the window rather than on the length of the history.
+
+    Parameters:
+        entity (str): 'video' for a single video, or 'channel' for a channel's rolled-up series.
+        key (str): The video URL or channel URL.
+        metric (str): The metric name (see TREND_METRICS).
+        start_date (datetime.date): The first day to include.
+        end_date (datetime.date): The last day to include.
+
+    Returns:
+        list: Time-ordered {'t', 'c'} points, t in hours since the epoch (see to_hour).
+    """
+    if entity == 'video':
+        query = """
+        SELECT t, c FROM trend_samples
+        WHERE video_id = (SELECT video_id FROM videos WHERE video_url = ?) AND metric = ? AND t >= ? AND t < ?
+        ORDER BY t;
+        """
+    elif entity == 'channel':
+        query = "SELECT t, c FROM channel_trend_samples WHERE channel_url = ? AND metric = ? AND t >= ? AND t < ? ORDER BY t;"
+    else:
+        raise ValueError(f"Unknown trend entity: {entity}")
+
+    conn = get_read_connection()
+    cursor = conn.cursor()
+
+    cursor.execute(query, (key, metric, *_time_range(start_date, end_date)))
+    return [{'t': t, 'c': c} for t, c in cursor.fetchall()]
+
+def fetch_channel_samples(video_channel_url, start_date=None, end_date=None):
+    """
+    Fetches the raw trend samples of every video in a channel.
+
+    With a date range, each video's last sample before the range is included too, since its
+    count still makes up the channel's total in the range (see trend_aggregation).
+
+    Parameters:
+        video_channel_url (str): The URL of the video channel.
+        start_date (datetime.date): The first day to include, or None for the whole history.
+        end_date (datetime.date): The last day to include, or None for the whole history.
+
+    Returns:
+        list: (video_id, metric, t, c) tuples ordered by video, metric and time, t in hours since the epoch.
+    """
+    conn = get_read_connection()
+    cursor = conn.cursor()
+
+    query = """
+    SELECT s.video_id, s.metric, s.t, s.c
+    FROM trend_samples s
+    JOIN videos v ON v.video_id = s.video_id
+    WHERE v.video_channel_url = ?
+    """
+    params = [video_channel_url]
+    if start_date is not None and end_date is not None:
+        start, end = _time_range(start_date, end_date)
+        # SQLite takes the bare c from the row holding MAX(t)
+        query += """ AND s.t >= ? AND s.t < ?
+    UNION ALL
+    SELECT s.video_id, s.metric, MAX(s.t), s.c
+    FROM trend_samples s
+    JOIN videos v ON v.video_id = s.video_id
+    WHERE v.video_channel_url = ? AND s.t < ?
+    GROUP BY s.video_id, s.metric
+    """
+        params.extend([start, end, video_channel_url, start])
+    query += " ORDER BY 1, 2, 3;"
+
+    cursor.execute(query, params)
+    return cursor.fetchall()
+
+def build_search_match(query):
+    """
+    Turns free text typed into the dashboard into an FTS5 MATCH expression.
+
+    Every word must match, and the last one also matches as a prefix so results
+    appear while the user is still typing.
+
+    Parameters:
+        query (str): The search text.
+
+    Returns:
+        str or None: The MATCH expression, or None if the text contains no words.
+    """
+    tokens = re.findall(r'\w+', query or '')
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+def search_video_ids(query, limit=None, ranked=True):
+    """
+    Searches video titles and hashtags through the full-text index.
+
+    Parameters:
+        query (str): The search text.
+        limit (int): The maximum number of results, or None for all of them.
+        ranked (bool): Order by relevance; without it the ids come back unordered, and much faster.
+
+    Returns:
+        list: Matching video_ids, best match first when ranked.
+    """
+    match = build_search_match(query)
+    if match is None:
+        return []
+
+    conn = get_read_connection()
+    cursor = conn.cursor()
+
+    order = 'ORDER BY rank' if ranked else ''
+    cursor.execute(f'SELECT rowid FROM videos_fts WHERE videos_fts MATCH ? {order} LIMIT ?',
+                   (match, -1 if limit is None else limit))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def fetch_channel_rollup(video_channel_url):
+    """
+    Fetches the precomputed totals of a channel.
+
+    Parameters:
+        video_channel_url (str): The URL of the video channel.
+
+    Returns:
+        dict or None: The channel's name, video count, total views, likes, dislikes and
+        comments and its average integrity score, or None if the channel is unknown.
+    """
+    conn = get_read_connection()
+    cursor = conn.cursor()
+
+    cursor.execute('''SELECT channel_name, video_count, views, likes, dislikes, comments,
+                             CAST(integrity_score_sum AS REAL) / video_count AS integrity_score
+                      FROM channels WHERE channel_url = ? AND video_count > 0''', (video_channel_url,))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+
+    columns = [desc[0] for desc in cursor.description]
+    return dict(zip(columns, row))
+
+@timed
+def fetch_due_refreshes(now, limit):
+    """
+    Fetches the videos whose next refresh time has passed, most overdue first.
+
+    Parameters:
+        now (str): The current UTC time in 'YYYY-MM-DD HH:MM:SS' format.
+        limit (int): The maximum number of videos to return.
+
+    Returns:
+        list: A dict per video with its video_id, video_url, video_upload_date, and the
+        last_refresh time and last_views count of its previous refresh (None if unknown).
+    """
+    conn = get_read_connection()
+    cursor = conn.cursor()
+
+    cursor.execute('''SELECT videos.video_id, video_url, video_upload_date, last_refresh, last_views
+                      FROM refresh_schedule JOIN videos ON videos.video_id = refresh_schedule.video_id
+                      WHERE next_refresh <= ? ORDER BY next_refresh LIMIT ?''', (now, limit))
+    columns = [desc[0] for desc in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+@timed
+def fetch_next_refresh_time():
+    """
+    Fetches the earliest scheduled refresh time.
+
+    Returns:
+        str or None: The UTC time in 'YYYY-MM-DD HH:MM:SS' format, or None if nothing is scheduled.
+    """
+    conn = get_read_connection()
+    cursor = conn.cursor()
+
+    cursor.execute('SELECT MIN(next_refresh) FROM refresh_schedule')
+    return cursor.fetchone()[0]
+
+@timed
+def schedule_refresh(video_id, next_refresh, last_refresh=None, last_views=None):
+    """
+    Sets the next refresh time of a video.
+
+    Parameters:
+        video_id (int): The ID of the video.
+        next_refresh (str): The UTC time of the next refresh in 'YYYY-MM-DD HH:MM:SS' format.
+        last_refresh (str): The time of the refresh just made, or None to keep the previous one.
+        last_views (int): The view count seen by that refresh, or None to keep the previous one.
+    """
+    conn = get_connection()
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute('''INSERT INTO refresh_schedule (video_id, next_refresh, last_refresh, last_views) VALUES (?, ?, ?, ?)
+                          ON CONFLICT (video_id) DO UPDATE SET next_refresh = excluded.next_refresh,
+                            last_refresh = COALESCE(excluded.last_refresh, last_refresh),
+                            last_views = COALESCE(excluded.last_views, last_views)''',
+                       (video_id, next_refresh, last_refresh, last_views))
+
+@timed
+def add_frontier_entries(kind, values, next_visit):
+    """
+    Adds entries to the discovery frontier, leaving entries already there untouched.
+
+    Parameters:
+        kind (str): 'query', 'hashtag' or 'video'.
+        values (list): The search queries, hashtags or video URLs.
+        next_visit (str): The UTC time the entries are due, in 'YYYY-MM-DD HH:MM:SS' format.
+    """
+    conn = get_connection()
+    with conn:
+        cursor = conn.cursor()
+        cursor.executemany('INSERT OR IGNORE INTO crawl_frontier (kind, value, next_visit) VALUES (?, ?, ?)',
+                           [(kind, value, next_visit) for value in values])
+
+@timed
+def fetch_due_frontier(kind, now, limit):
+    """
+    Fetches the frontier entries of a kind that are due, most overdue first.
+
+    Parameters:
+        kind (str): 'query', 'hashtag' or 'video'.
+        now (str): The current UTC time in 'YYYY-MM-DD HH:MM:SS' format.
+        limit (int): The maximum number of entries to return.
+
+    Returns:
+        list: The due values.
+    """
+    conn = get_read_connection()
+    cursor = conn.cursor()
+
+    cursor.execute('SELECT value FROM crawl_frontier WHERE kind = ? AND next_visit <= ? ORDER BY next_visit LIMIT ?',
+                   (kind, now, limit))
+    return [row[0] for row in cursor.fetchall()]
+
+@timed
+def fetch_frontier_values(kind):
+    """
+    Fetches every frontier entry of a kind, due or not.
+
+    Parameters:
+        kind (str): 'query', 'hashtag' or 'video'.
+
+    Returns:
+        list: The values.
+    """
+    conn = get_read_connection()
+    cursor = conn.cursor()
+
+    cursor.execute('SELECT value FROM crawl_frontier WHERE kind = ?', (kind,))
+    return [row[0] for row in cursor.fetchall()]
+
+@timed
+def reschedule_frontier_entries(kind, values, next_visit):
+    """
+    Sets the time frontier entries are next due.
+
+    Parameters:
+        kind (str): 'query', 'hashtag' or 'video'.
+        values (list): The entries to reschedule.
+        next_visit (str): The UTC time they are next due, in 'YYYY-MM-DD HH:MM:SS' format.
+    """
+    conn = get_connection()
+    with conn:
+        cursor = conn.cursor()
+        cursor.executemany('UPDATE crawl_frontier SET next_visit = ? WHERE kind = ? AND value = ?',
+                           [(next_visit, kind, value) for value in values])
+
+@timed
+def remove_frontier_entries(kind, values):
+    """
+    Removes entries from the discovery frontier.
+
+    Parameters:
+        kind (str): 'query', 'hashtag' or 'video'.
+        values (list): The entries to remove.
+    """
+    conn = get_connection()
+    with conn:
+        cursor = conn.cursor()
+        cursor.executemany('DELETE FROM crawl_frontier WHERE kind = ? AND value = ?', [(kind, value) for value in values])
+
+def fetch_compacted_until(tier):
+    """
+    Fetches how far back a retention tier has compacted the trend history.
+
+    Parameters:
+        tier (str): The tier name, e.g. 'daily'.
+
+    Returns:
+        int or None: The end of the compacted range, in hours since the epoch (see to_hour), or None if the tier never ran.
+    """
+    conn = get_read_connection()
+    cursor = conn.cursor()
+
+    cursor.execute('SELECT compacted_until FROM trend_compaction WHERE tier = ?', (tier,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+@timed
+def compact_trend_samples(tier, bucket, start, end):
+    """
+    Replaces the samples in a time range with one point per bucket, in a single transaction.
+
+    Each video's samples in a bucket become one row at the bucket's time, holding the last count
+    (c) and the lowest and highest counts (c_min, c_max) of the rows it replaces, which may be
+    points of a finer tier. Buckets that are already a single point are left alone, so compacting
+    a range twice changes nothing. The trend triggers are dropped while the samples are replaced,
+    the channel series in the range is then recomputed from the compacted video points (the points
+    after it are unchanged, as every video's last count in a bucket is kept), and the tier's
+    progress is recorded.
+
+    Parameters:
+        tier (str): The tier name the progress is recorded under.
+        bucket (str): SQL expression mapping a sample time t to its bucket's time; it must
+            keep every bucket within [start, end).
+        start (int): The first hour to compact (see to_hour), or None for the beginning of the history.
+        end (int): The hour compaction stops before.
+
+    Returns:
+        int: The number of sample rows removed.
+    """
+    conn = get_connection()
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute('BEGIN')
+        time_range = (start or 0, end)
+        _drop_trend_triggers(cursor)
+
+        cursor.execute('DROP TABLE IF EXISTS temp.compacted')
+        cursor.execute(f'''CREATE TEMP TABLE compacted AS
+                           SELECT g.*, (SELECT s.c FROM trend_samples s WHERE s.video_id = g.video_id AND s.metric = g.metric AND s.t = g.last_t) AS c
+                           FROM (SELECT video_id, metric, {bucket} AS bucket, MAX(t) AS last_t,
+                                        MIN(COALESCE(c_min, c)) AS c_min, MAX(COALESCE(c_max, c)) AS c_max, COUNT(*) AS samples
+                                 FROM trend_samples WHERE t >= ? AND t < ?
+                                 GROUP BY video_id, metric, bucket
+                                 HAVING COUNT(*) > 1 OR MAX(t) <> {bucket}) g''', time_range)
+        removed = cursor.execute('SELECT COALESCE(SUM(samples - 1), 0) FROM temp.compacted').fetchone()[0]
+
+        if cursor.execute('SELECT 1 FROM temp.compacted LIMIT 1').fetchone():
+            cursor.execute(f'''DELETE FROM trend_samples WHERE t >= ? AND t < ?
+                               AND (video_id, metric, {bucket}) IN (SELECT video_id, metric, bucket FROM temp.compacted)''', time_range)
+            cursor.execute('''INSERT INTO trend_samples (video_id, metric, t, c, c_min, c_max)
+                              SELECT video_id, metric, bucket, c, c_min, c_max FROM temp.compacted''')
+            _recompute_channel_samples(cursor, *time_range)
+            _bump_write_generation(cursor)
+        cursor.execute('DROP TABLE temp.compacted')
+        _create_trend_triggers(cursor)
 
-    return video_list
\ No newline at end of file
+        cursor.execute('''INSERT INTO trend_compaction (tier, compacted_until) VALUES (?, ?)
+                          ON CONFLICT (tier) DO UPDATE SET compacted_until = excluded.compacted_until''', (tier, end))
+    return removed
\ No newline at end of file
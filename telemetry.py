@@ -0,0 +1,276 @@
+import functools
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from config import TELEMETRY_ENABLED, METRICS_PATH, LATENCY_BUCKETS
+
+# Help text for every metric the scraper exports
+METRICS = {
+    "scrape_stage_seconds": ("histogram", "Time spent in each scraping, processing and database stage."),
+    "scrape_stage_failures_total": ("counter", "Calls to a stage that raised, by exception type."),
+    "scrape_wait_timeouts_total": ("counter", "Page loads abandoned because an element never appeared, by XPath."),
+    "scrape_page_bytes_total": ("counter", "Bytes transferred by loaded pages (a lower bound), by the stage that loaded them."),
+    "scrape_pages_measured_total": ("counter", "Loaded pages whose transferred bytes were measured, by stage."),
+    "scrape_fields_total": ("counter", "Video page fields read, by field, source and outcome (found or missing)."),
+    "scrape_cycles_total": ("counter", "Completed scrape cycles, by kind."),
+    "scrape_cycle_overruns_total": ("counter", "Scrape cycles that took longer than their budget, by kind."),
+    "scrape_cycle_last": ("gauge", "Summary of the most recent cycle of each kind."),
+    "ingest_writer": ("gauge", "BatchWriter metrics at the end of the most recent cycle."),
+}
+
+_NULL_STAGE = nullcontext()
+
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+_gauges = {}
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+def observe(stage, seconds):
+    """
+    Records one call's duration in the stage's latency histogram.
+
+    Parameters:
+        stage (str): The stage name, e.g. 'scraper.get_video_data'.
+        seconds (float): How long the call took.
+    """
+    if not TELEMETRY_ENABLED:
+        return
+    key = _key("scrape_stage_seconds", {"stage": stage})
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            # One count per bucket plus +Inf, then the sum of observations
+            histogram = _histograms[key] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0]
+        histogram[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        histogram[-1] += seconds
+
+def count(name, value=1, **labels):
+    """
+    Adds to a counter.
+
+    Parameters:
+        name (str): The metric name, one of METRICS.
+        value (int): The amount to add.
+        **labels: The counter's labels.
+    """
+    if not TELEMETRY_ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def set_gauge(name, value, **labels):
+    """
+    Sets a gauge to its current value.
+
+    Parameters:
+        name (str): The metric name, one of METRICS.
+        value (float): The value.
+        **labels: The gauge's labels.
+    """
+    if not TELEMETRY_ENABLED:
+        return
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+class _Stage:
+    """
+    Times a block of code as a stage, counting it as a failure if it raises.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        observe(self.name, time.perf_counter() - self.start)
+        if exc_type is not None:
+            count("scrape_stage_failures_total", stage=self.name, error=exc_type.__name__)
+        return False
+
+def stage(name):
+    """
+    Returns a context manager timing the block it wraps as `name`; a shared no-op when telemetry is off.
+    """
+    return _Stage(name) if TELEMETRY_ENABLED else _NULL_STAGE
+
+def timed(function):
+    """
+    Decorator timing every call of a function as the stage 'module.function'.
+
+    When telemetry is off the function is returned unchanged, so it costs nothing.
+    """
+    if not TELEMETRY_ENABLED:
+        return function
+    name = f"{function.__module__}.{function.__name__}"
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with _Stage(name):
+            return function(*args, **kwargs)
+    return wrapper
+
+def record_fields(found, missing, source="browser"):
+    """
+    Counts the fields read from a video page and the ones that were missing.
+
+    Parameters:
+        found (list): Names of the fields that were read.
+        missing (list): Names of the fields that could not be read.
+        source (str): How the page was read, 'browser' or 'http'.
+    """
+    if not TELEMETRY_ENABLED:
+        return
+    keys = [_key("scrape_fields_total", {"field": field, "outcome": outcome, "source": source})
+            for fields, outcome in ((found, "found"), (missing, "missing")) for field in fields]
+    with _lock:
+        for key in keys:
+            _counters[key] = _counters.get(key, 0) + 1
+
+def record_cycle(kind, report, writer_metrics=None):
+    """
+    Records the summary of a finished cycle and writes the metrics file.
+
+    Parameters:
+        kind (str): The kind of cycle, 'refresh' or 'discovery'.
+        report (dict): The scrape_in_parallel report.
+        writer_metrics (dict): BatchWriter.metrics() after the cycle's writes were flushed.
+    """
+    if not TELEMETRY_ENABLED:
+        return
+    count("scrape_cycles_total", kind=kind)
+    overran = report["budget"] and report["duration"] > report["budget"]
+    if overran:
+        count("scrape_cycle_overruns_total", kind=kind)
+    summary = {
+        "pages": report["pages"],
+        "succeeded": report["succeeded"],
+        "failed": len(report["failures"]),
+        "searches": report.get("searches", 0),
+        "duration_seconds": report["duration"],
+        "budget_seconds": report["budget"],
+        "overran": int(bool(overran)),
+        "finished_timestamp": time.time(),
+    }
+    for field, value in summary.items():
+        set_gauge("scrape_cycle_last", value, kind=kind, field=field)
+    for field, value in (writer_metrics or {}).items():
+        set_gauge("ingest_writer", value, field=field)
+    write_metrics()
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(labels):
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}" if labels else ""
+
+def render():
+    """
+    Renders every metric in the Prometheus text exposition format.
+
+    Returns:
+        str: The metrics, one sample per line.
+    """
+    with _lock:
+        histograms = {key: list(value) for key, value in _histograms.items()}
+        samples = {**_counters, **_gauges}
+
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for (metric, labels), histogram in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, bucket in zip(LATENCY_BUCKETS + ["+Inf"], histogram[:-1]):
+                cumulative += bucket
+                lines.append(f"{name}_bucket{_labels(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {histogram[-1]}")
+            lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+        for (metric, labels), value in sorted(samples.items()):
+            if metric == name:
+                lines.append(f"{name}{_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+def write_metrics(path=METRICS_PATH):
+    """
+    Writes the metrics file atomically, so a collector or the ops page never reads it half written.
+
+    Parameters:
+        path (str): Where to write; a Prometheus node exporter's textfile directory works.
+    """
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as f:
+        f.write(render())
+    os.replace(temporary, path)
+
+_SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)$')
+_LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+def parse_metrics(text):
+    """
+    Parses Prometheus text back into samples.
+
+    Parameters:
+        text (str): The contents of a metrics file.
+
+    Returns:
+        list: (name, labels, value) tuples; labels is a dict.
+    """
+    samples = []
+    for line in text.splitlines():
+        match = _SAMPLE.match(line)
+        if not match:
+            continue
+        name, labels, value = match.groups()
+        labels = {label: re.sub(r'\\(.)', lambda m: "\n" if m.group(1) == "n" else m.group(1), raw)
+                  for label, raw in _LABEL.findall(labels or "")}
+        samples.append((name, labels, float(value)))
+    return samples
+
+def read_metrics(path=METRICS_PATH):
+    """
+    Reads and parses the metrics file the scraper writes.
+
+    Returns:
+        tuple: The samples from parse_metrics and the file's modification time, or ([], None) if it does not exist.
+    """
+    try:
+        with open(path) as f:
+            return parse_metrics(f.read()), os.path.getmtime(path)
+    except FileNotFoundError:
+        return [], None
+
+def histogram_quantile(quantile, buckets):
+    """
+    Estimates a quantile from cumulative histogram buckets, as Prometheus does.
+
+    Parameters:
+        quantile (float): The quantile, between 0 and 1.
+        buckets (list): (upper bound, cumulative count) pairs in increasing order, ending with +Inf.
+
+    Returns:
+        float or None: The estimate, or None if the histogram is empty.
+    """
+    total = buckets[-1][1] if buckets else 0
+    if not total:
+        return None
+    rank = quantile * total
+    lower, below = 0.0, 0
+    for bound, cumulative in buckets:
+        if cumulative >= rank:
+            if bound == float("inf"):
+                return lower
+            return lower + (bound - lower) * (rank - below) / max(cumulative - below, 1)
+        lower, below = bound, cumulative
+    return lower
@@ -0,0 +1,34 @@
+"""
+Checks that the browser and HTTP scraping paths read the same hashtags from the same page.
+
+Uses the captures in benchmarks/fixtures: the browser path runs against the rendered page's
+elements through the benchmark's FakeDriver, the HTTP path parses the served HTML.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import http_scraper
+import scraper
+from scraper_pipeline import FIXTURES, FakeDriver, load_capture
+
+VIDEO_URL = "https://www.bitchute.com/video/fixture/"
+
+@pytest.mark.parametrize("mode", ["script", "elements"])
+def test_browser_and_http_hashtags_match(monkeypatch, mode):
+    monkeypatch.setattr(scraper, "EXTRACTION_MODE", mode)
+    video_page = load_capture("video_page.json")
+    driver = FakeDriver(video_page, load_capture("search_page.json"))
+    with open(os.path.join(FIXTURES, video_page["html"])) as f:
+        html = f.read()
+
+    browser = scraper.get_video_data(driver, VIDEO_URL)
+    http = http_scraper.parse_video_page(html, VIDEO_URL)
+
+    assert browser["video_hashtags"]
+    assert browser["video_hashtags"] == http["video_hashtags"]
\ No newline at end of file
@@ -0,0 +1,43 @@
+import pandas as pd
+from sql_operations import TREND_METRICS
+
+SAMPLE_COLUMNS = ['video_id', 'metric', 't', 'c']
+
+def aggregate_channel_samples(rows, start=None):
+    """
+    Computes a channel's trend series from the trend samples of all of its videos.
+
+    Like the rollup sql_operations keeps, the series has a point at every hour any video was
+    sampled, holding the sum of each video's latest count at that hour, so a video that was not
+    sampled in that hour still counts. Each sample's difference from the video's previous one is
+    summed per metric and hour and accumulated, in one columnar pass over the concatenated samples
+    instead of one DataFrame per video and metric.
+
+    Parameters:
+        rows (list): (video_id, metric, t, c) tuples ordered by video, metric and time, e.g. from
+            sql_operations.fetch_channel_samples. When a video has several samples for the same hour,
+            the last one wins.
+        start (int): The first hour to return (see sql_operations.to_hour); earlier samples only carry
+            their counts into the range. None returns every hour.
+
+    Returns:
+        dict: A dictionary mapping each trend column name ('video_views_trend', ...) to a
+        time-ordered list of {'t', 'c'} points.
+    """
+    result = {column: [] for column in TREND_METRICS.values()}
+    if not rows:
+        return result
+
+    frame = pd.DataFrame.from_records(rows, columns=SAMPLE_COLUMNS)
+    frame = frame.drop_duplicates(subset=['video_id', 'metric', 't'], keep='last')
+    frame['c'] -= frame.groupby(['video_id', 'metric'], sort=False)['c'].shift(fill_value=0)
+    totals = frame.groupby(['metric', 't'], sort=True)['c'].sum().groupby(level='metric').cumsum()
+    if start is not None:
+        totals = totals[totals.index.get_level_values('t') >= start]
+
+    metrics = totals.index.get_level_values('metric')
+    times = totals.index.get_level_values('t')
+    for metric, column in TREND_METRICS.items():
+        selected = metrics == metric
+        result[column] = [{'t': t, 'c': int(c)} for t, c in zip(times[selected], totals.to_numpy()[selected])]
+    return result
\ No newline at end of file
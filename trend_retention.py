@@ -0,0 +1,54 @@
+import logging
+from datetime import datetime, timedelta
+from config import TREND_HOURLY_DAYS, TREND_DAILY_DAYS
+from sql_operations import fetch_compacted_until, compact_trend_samples, to_hour
+
+logger = logging.getLogger(__name__)
+
+def _day_start(time):
+    """
+    Returns midnight at the start of the day containing `time`.
+    """
+    return time.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def _week_start(time):
+    """
+    Returns midnight at the start of the Monday-to-Sunday week containing `time`.
+    """
+    return _day_start(time) - timedelta(days=time.weekday())
+
+# Retention tiers, finest first: (name, SQL expression giving a sample's bucket time, the age
+# after which samples are compacted into it, and the alignment of that cutoff to whole buckets).
+# A bucket's point is stored at the last hour of its day or week, so the points of every video
+# line up and channel sums stay meaningful. Times are hours since the epoch, whose day 0 was a
+# Thursday, so (day + 3) / 7 numbers the Monday-to-Sunday weeks.
+TIERS = [
+    ('daily', "t / 24 * 24 + 23", TREND_HOURLY_DAYS, _day_start),
+    ('weekly', "((t / 24 + 3) / 7 * 7 + 3) * 24 + 23", TREND_DAILY_DAYS, _week_start),
+]
+
+def compact_trends(now=None):
+    """
+    Rolls trend history older than each tier's age up to daily and then weekly points.
+
+    Every tier resumes from where it last stopped and only moves forward in whole buckets, so
+    calling this often is cheap: a tier does work at most once per bucket. Compaction is
+    idempotent, and the trend readers need no changes, since a compacted point is an ordinary
+    sample row at its bucket's time.
+
+    Parameters:
+        now (datetime.datetime): The current UTC time; defaults to now.
+
+    Returns:
+        dict: The number of sample rows removed by each tier that ran.
+    """
+    now = now or datetime.utcnow()
+    removed = {}
+    for tier, bucket, days, align in TIERS:
+        cutoff = align(now - timedelta(days=days))
+        start = fetch_compacted_until(tier)
+        if start is not None and start >= to_hour(cutoff):
+            continue
+        removed[tier] = compact_trend_samples(tier, bucket, start, to_hour(cutoff))
+        logger.info("Compacted %s trend history up to %s: %d samples removed", tier, cutoff, removed[tier])
+    return removed
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timezone
 import random
 
 def preprocess_date_string(date_string):
@@ -52,4 +52,19 @@ def info_integrity_score():
     Returns:
         int: A random integrity score between 1 and 100, representing the videos integrity.
     """
-    return random.randint(1, 100)
\ No newline at end of file
+    return random.randint(1, 100)
+
+def convert_iso_to_datetime(iso_string):
+    """
+    Converts an ISO 8601 timestamp into the standardized UTC datetime format.
+    
+    Parameters:
+        iso_string (str): A timestamp such as '2024-09-19T16:46:00Z' or '2024-09-19T18:46:00+02:00'.
+    
+    Returns:
+        str: A formatted date string in 'YYYY-MM-DD HH:MM:SS' format, in UTC.
+    """
+    parsed = datetime.fromisoformat(iso_string.strip().replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.strftime('%Y-%m-%d %H:%M:%S')